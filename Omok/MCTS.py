@@ -1,24 +1,76 @@
+import time
 import torch
 import random
+import threading
 import numpy as np
 from math import sqrt
 
 from config import *
 from utils.transpose_state import *
+from Omok.transposition import *
+from Omok.evalCache import *
+from Omok.state import *
 
 
+VIRTUAL_LOSS = 1
+
 class MCTS:
     '''
-    MCTS(n_playout : int)
+    MCTS(n_playout : int, use_threats : bool, n_batch : int, reuse_tree : bool, count_reused : bool, 
+         use_transposition : bool, transposition_mb : float, use_nn_cache : bool, time_limit : float, 
+         early_stop : bool, stop_confidence : float, use_solver : bool)
 
     The MCTS class performs Monte Carlo Tree Search (MCTS) simulations to derive the policy for the current state.
     The parameter n_playout defines the number of simulations used to generate a single policy.
+    time_limit(sec) makes the search anytime : it stops at the deadline or after n_playout playouts (None : no limit),
+    and the policy is made from the visits so far. n_playouts_done is the playouts of the last search.
+    use_threats=True searches only the forced moves of state.get_forced_actions() when they exist.
+    n_batch > 1 evaluates up to n_batch leaves by a single nn call. (see _search_batched())
+    reuse_tree=True keeps the tree of each model, and the next search starts from the node of the new state. (see _get_root_node())
+    count_reused=True counts the reused visits of the root as playouts, so n_playout is the total visits of the root.
+    use_transposition=True shares the subtree of the same stones reached by another move order. (see TranspositionTable)
+    use_nn_cache=True takes the nn outputs from nn_cache, shared by every MCTS. (see EvalCache)
+    early_stop=True ends a greedy search (temp == 0) when the most visited action cannot be overtaken by the playouts left.
+    stop_confidence also ends it when that action has stop_confidence of the visits, after a quarter of n_playout. (see _is_decided())
+    use_solver=True proves nodes by terminal & forced results (MCTS-solver) : proven-losing children are not selected,
+    and the search ends when the root is proven. (see propagate_proven())
     '''
-    def __init__(self, n_playout):
+    def __init__(self, n_playout, use_threats=USE_THREAT_DETECTION, n_batch=N_LEAF_BATCH, 
+                 reuse_tree=REUSE_TREE, count_reused=COUNT_REUSED_VISITS, 
+                 use_transposition=USE_TRANSPOSITION, transposition_mb=TRANSPOSITION_MB, use_nn_cache=USE_NN_CACHE, 
+                 time_limit=None, early_stop=EARLY_STOP, stop_confidence=STOP_CONFIDENCE, use_solver=USE_SOLVER):
+        if n_playout is None and time_limit is None:
+            raise ValueError("MCTS needs n_playout or time_limit.")
+
         self.n_playout = n_playout
+        self.time_limit = time_limit
+        self.n_playouts_done = 0
+        self.early_stop = early_stop
+        self.stop_confidence = stop_confidence
+        self.use_threats = use_threats
+        self.use_solver = use_solver
+        self.n_batch = n_batch
+        self.reuse_tree = reuse_tree
+        self.count_reused = count_reused
         self.legal_policy = None
         self.child_n = []
 
+        # kept root of each model (by id) & visits of the root reused by the last search
+        self.root_nodes = {}
+        self.n_reused = 0
+
+        # transposition table of each model (by id)
+        self.use_transposition = use_transposition
+        self.transposition_mb = transposition_mb
+        self.tables = {}
+
+        self.cache = nn_cache if use_nn_cache else None
+
+        # playouts & time of every search so far, playouts saved by the early stop
+        self.n_searched = 0
+        self.search_time = 0.0
+        self.n_saved = 0
+
     def get_legal_policy(self, state, model, temp):
         '''
         get_legal_policy(state : class, model : nn.Module, temp : float) -> legal_policy : list[float]
@@ -28,15 +80,17 @@ class MCTS:
         Sepically when temp == 0, the legal policy will be formed as one-hot encoded vector.
         '''
 
-        # define root node
-        root_node = Node(state, 1.0)
+        forced_actions, _ = state.get_forced_actions() if self.use_threats else (None, None)
 
-        # launch MCTS == expansion of Tree 
-        for _ in range(self.n_playout):
-            root_node.evaluate_value(model)
+        if forced_actions is None:
+            childs_n = self._search(state, model, greedy=(temp == 0))
 
-        # check child nodes' visit cnt
-        childs_n = get_n_child(root_node.child_nodes)
+        else:
+            # nothing to search : each forced action counts as a single visit
+            self.n_playouts_done = 0
+            childs_n = [0] * len(state.get_legal_actions())
+            for action in forced_actions:
+                childs_n[state.get_action_slot(action)] = 1
 
         self.child_n = childs_n
         
@@ -52,6 +106,254 @@ class MCTS:
 
         return legal_policy
 
+    def _search(self, state, model, greedy=False):
+        '''
+        _search(state : class, model : nn.Module, greedy : bool) -> childs_n : list
+
+        This method builds the tree of state by n_playout playouts (or until the deadline) and returns visit cnt of every legal action.
+        greedy=True stops the search when the most visited action is decided. (only its argmax is used)
+        '''
+        # define root node
+        root_node = self._get_root_node(state, model)
+        self.n_reused = root_node.n
+
+        n_playout, deadline = self._get_budget()
+        table = self.get_table(model, root_node)
+        start = time.perf_counter()
+
+        # launch MCTS == expansion of Tree 
+        if self.n_batch == 1:
+            n_done = 0
+            while in_budget(n_done, n_playout, deadline, root_node.n) and root_node.proven is None:
+                if greedy and self._is_decided(root_node.child_stats, n_done, n_playout):
+                    break
+
+                root_node.evaluate_value(model, self.use_threats, table, self.cache, self.use_solver)
+                n_done += 1
+        else:
+            n_done = self._search_batched(root_node, model, n_playout, deadline, greedy)
+
+        self._count_playouts(n_done, n_playout, start)
+
+        if self.reuse_tree:
+            self.root_nodes[id(model)] = root_node
+
+        # check child nodes' visit cnt
+        return get_n_legal(root_node)
+
+    def _count_playouts(self, n_done, n_playout, start):
+        self.n_playouts_done = n_done
+        self.n_searched += n_done
+        self.search_time += time.perf_counter() - start
+
+        # the deadline is not counted as an early stop
+        if n_playout != float('inf') and (self.time_limit is None or time.perf_counter() < start + self.time_limit):
+            self.n_saved += n_playout - n_done
+
+    def _is_decided(self, child_stats, n_done, n_playout):
+        '''
+        _is_decided(child_stats : tuple | None, n_done : int, n_playout : int | float) -> bool
+
+        visit gap : the most visited action has more visits than the second one + the playouts left.
+        confidence : the most visited action has stop_confidence of the visits, after a quarter of n_playout.
+        '''
+        if not self.early_stop or child_stats is None:
+            return False
+
+        child_n = child_stats[0]
+        if len(child_n) == 1:
+            return True
+
+        second_n, best_n = np.partition(child_n, -2)[-2:]
+
+        if best_n - second_n > n_playout - n_done:
+            return True
+
+        return self.stop_confidence is not None and n_done >= n_playout / 4 and best_n >= self.stop_confidence * child_n.sum()
+
+    def _get_budget(self):
+        '''
+        _get_budget() -> n_playout : int | float, deadline : float
+
+        playouts to run (inf without n_playout) & deadline of time.perf_counter() (inf without time_limit) of a search.
+        '''
+        n_playout = self.n_playout if self.n_playout is not None else float('inf')
+        if self.count_reused:
+            n_playout = max(n_playout - self.n_reused, 0)
+
+        deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else float('inf')
+
+        return n_playout, deadline
+
+    def _get_root_node(self, state, model):
+        '''
+        _get_root_node(state : class, model : nn.Module) -> root_node : Node
+
+        This method moves the kept root of the model down through the moves made after it (our move, the opponent's move),
+        and returns the node of state with its subtree. A fresh root is returned when state is not reached by them.
+        '''
+        root_node = self.root_nodes.pop(id(model), None) if self.reuse_tree else None
+
+        if root_node is None:
+            return Node(state, 1.0)
+
+        n_moves = state.n_stones - root_node.state.n_stones
+        if n_moves not in (0, 1, 2):
+            return Node(state, 1.0)
+
+        # new stones of the player (our move) & the enemy (opponent's move) of the kept root
+        boards = [board.reshape(-1) for board in root_node.state._get_boards()]
+        new_boards = [board.reshape(-1) for board in state._get_boards()]
+        if n_moves == 1:
+            new_boards = new_boards[::-1]
+
+        actions = [np.flatnonzero(new_board != board) for board, new_board in zip(boards, new_boards)]
+
+        if len(actions[0]) != (n_moves + 1) // 2 or len(actions[1]) != n_moves // 2 or \
+           any(boards[color][action] != 0 for color in (0, 1) for action in actions[color]):
+            return Node(state, 1.0)
+
+        for action in np.concatenate(actions):
+            child_nodes = [child_node for child_node in root_node.child_nodes if child_node.action == action]
+            if len(child_nodes) == 0:
+                return Node(state, 1.0)
+
+            if child_nodes[0].state is None:
+                child_nodes[0].state = root_node.state.next(int(action))
+            root_node = child_nodes[0]
+
+        # same stones but different features (e.g. next_action)
+        if root_node.state.next_action != state.next_action:
+            return Node(state, 1.0)
+
+        return root_node
+
+    def get_table(self, model, root_node=None):
+        '''
+        get_table(model : nn.Module, root_node : Node) -> table : TranspositionTable | None
+
+        A fresh root_node (no visits) clears the table, so a search without the kept tree
+        does not take over the subtrees (and visits) of the previous searches.
+        '''
+        if not self.use_transposition:
+            return None
+
+        if id(model) not in self.tables:
+            self.tables[id(model)] = TranspositionTable(self.transposition_mb)
+        table = self.tables[id(model)]
+
+        if root_node is not None and root_node.n == 0:
+            table.clear()
+        return table
+
+    def get_search_stats(self):
+        '''
+        get_search_stats() -> stats : dict
+
+        playouts/sec of every search so far, playouts saved by the early stop, 
+        and the stats of the transposition tables. (see TranspositionTable.get_stats())
+        '''
+        stats = {'playouts' : self.n_searched, 
+                 'playouts_per_sec' : self.n_searched / self.search_time if self.search_time else 0.0,
+                 'playouts_saved' : self.n_saved,
+                 'saved_rate' : self.n_saved / (self.n_searched + self.n_saved) if self.n_searched + self.n_saved else 0.0}
+
+        if self.use_transposition:
+            table_stats = [table.get_stats() for table in self.tables.values()]
+            n_lookups = sum(table_stat['hits'] + table_stat['misses'] for table_stat in table_stats)
+
+            for name in ('size', 'hits', 'misses', 'evicted', 'nbytes'):
+                stats[f'tt_{name}'] = sum(table_stat[name] for table_stat in table_stats)
+            stats['tt_hit_rate'] = stats['tt_hits'] / n_lookups if n_lookups else 0.0
+
+        return stats
+
+    def _search_batched(self, root_node, model, n_playout=None, deadline=float('inf'), greedy=False):
+        '''
+        _search_batched(root_node : Node, model : nn.Module, n_playout : int, deadline : float, greedy : bool) -> n_done : int
+
+        This method runs n_playout(default self.n_playout) playouts, collecting up to n_batch leaves before each nn call.
+        The deadline (and the early stop of greedy) is checked between batches, so the search ends at most one batch after it.
+        Each descent puts a virtual loss on its path, so the next descents spread over other leaves.
+        A batch stops early when a descent reaches a leaf already waiting for the nn.
+        Terminal & proven leaves are backed up at once, the others after predict_batch().
+        '''
+        n_playout = self.n_playout if n_playout is None else n_playout
+        table = self.get_table(model)
+        n_done = 0
+
+        while in_budget(n_done, n_playout, deadline, root_node.n) and root_node.proven is None:
+            if greedy and self._is_decided(root_node.child_stats, n_done, n_playout):
+                break
+
+            leaves, paths = [], []
+
+            while len(leaves) < self.n_batch and n_done < n_playout:
+                path = root_node.select_leaf()
+                leaf = path[-1]
+
+                if any(leaf is waiting_leaf for waiting_leaf in leaves):
+                    revert_virtual_loss(path)
+                    break
+
+                n_done += 1
+                value = leaf.evaluate_leaf(self.use_threats, table, self.use_solver)
+
+                if value is None:
+                    leaves.append(leaf)
+                    paths.append(path)
+                else:
+                    backup(path, value)
+
+                    if self.use_solver and leaf.proven is not None:
+                        propagate_proven(path)
+                        if root_node.proven is not None:
+                            break
+
+            if len(leaves) == 0:
+                continue
+
+            legal_policies, values = predict_batch(model, [leaf.state for leaf in leaves], self.cache)
+
+            for leaf, path, legal_policy, value in zip(leaves, paths, legal_policies, values):
+                if len(leaf.child_nodes) == 0:
+                    leaf.expand(leaf.state.get_legal_actions(), legal_policy)
+
+                    if table is not None:
+                        table.store(leaf.state, leaf, value)
+                backup(path, value)
+
+        return n_done
+
+    def ponder(self, state, model, stop, max_playout=PONDER_PLAYOUTS):
+        '''
+        ponder(state : class, model : nn.Module, stop : threading.Event, max_playout : int) -> n_done : int
+
+        This method searches state (the opponent to move) on the opponent's time, until stop is set or after max_playout playouts.
+        The tree is kept, so the next search starts from the subtree of the opponent's move. (reuse_tree=True)
+        With count_reused=True, that search only runs the playouts left of n_playout.
+        stop is checked between batches of n_batch leaves. No other search of the model may run meanwhile.
+        '''
+        root_node = self._get_root_node(state, model)
+        self.get_table(model, root_node)
+        n_done = 0
+
+        while not stop.is_set() and n_done < max_playout and not root_node.is_done() and root_node.proven is None:
+            n_done += self._search_batched(root_node, model, min(self.n_batch, max_playout - n_done))
+
+        self.root_nodes[id(model)] = root_node
+        return n_done
+
+    def reset_tree(self):
+        '''
+        reset_tree() -> None
+
+        This method drops the kept trees & transposition tables. (e.g. a new game, or new weights of a model)
+        '''
+        self.root_nodes.clear()
+        self.tables.clear()
+        self.n_reused = 0
+
     def get_legal_actions_of(self, model, temp, with_policy=False):
         '''
          get_legal_actions_of(model, temp, with_policy=False) ->  get_legal_actions_of : method
@@ -77,13 +379,14 @@ class MCTS:
             return values are based on *whole action space*.
             '''
             self.legal_policy = self.get_legal_policy(state, model, temp)
-            action = np.random.choice(state.get_legal_actions(), p=self.legal_policy)
+            legal_actions = state.get_legal_actions()
+            action = np.random.choice(legal_actions, p=self.legal_policy)
 
             learned_policy = np.zeros([state.n_actions])
-            learned_policy[state.get_legal_actions()] = self.legal_policy
+            learned_policy[legal_actions] = self.legal_policy
 
             visits_cnt = np.zeros([state.n_actions])
-            visits_cnt[state.get_legal_actions()] = self.child_n
+            visits_cnt[legal_actions] = self.child_n
 
             return action, learned_policy, visits_cnt 
         
@@ -104,65 +407,199 @@ class MCTS:
     
 
 class Node:
-    __slots__ = ('state', 'p', 'n', 'w', 'child_nodes')
+    __slots__ = ('state', 'action', 'stats', 'slot', 'child_nodes', 'child_stats', 'done')
     '''
-    Node(state : class, p : float)
+    Node(state : class, p : float, action : int)
 
     The Node class is used in the MCTS class to perform Monte Carlo Tree Search(MCTS). 
+    Child nodes are created with their action only(state=None), 
+    and their state is made from the parent's state when the search visits them first.
+    Only non-terminal nodes are expanded, so a node with child nodes is never terminal.
+    PUCT stats (n, w, p) of the child nodes are stored in arrays of the parent(child_stats), 
+    so a child node is selected by a single vectorized expression. n, w, p of a node read them by its slot.
+    The 4th array keeps the proven result of each child for its own player (1 : win, 0 : draw, -1 : lose, nan : unknown).
+    (MCTS-solver, see propagate_proven())
 
     : main method : 
-    evaluate_value(model) -> value
+    evaluate_value(model, use_threats) -> value (a single playout)
+    select_path() -> path
+    select_leaf() -> path (for batched search)
 
     '''
-    def __init__(self, state, p):
+    def __init__(self, state, p, action=None, stats=None, slot=0):
         self.state = state
-        self.p = p # prior prob
-        self.n = 0 # n_visit
-        self.w = 0 # cum weight
+        self.action = action # action from parent node
+
+        # (n_visit, cum weight, prior prob) arrays which has this node at slot. (root has its own)
+        self.stats = (np.zeros(1, dtype=np.int64), np.zeros(1), np.array([p], dtype=np.float64), np.full(1, np.nan)) if stats is None else stats
+        self.slot = slot
+
         self.child_nodes = []
+        self.child_stats = None
+
+        self.done = None # state.is_done(), computed when the node becomes a leaf
+
+    @property
+    def n(self):
+        return int(self.stats[0][self.slot])
+
+    @n.setter
+    def n(self, n):
+        self.stats[0][self.slot] = n
+
+    @property
+    def w(self):
+        return float(self.stats[1][self.slot])
 
-    def evaluate_value(self, model):
+    @w.setter
+    def w(self, w):
+        self.stats[1][self.slot] = w
+
+    @property
+    def p(self):
+        return float(self.stats[2][self.slot])
+
+    @property
+    def proven(self):
+        proven = self.stats[3][self.slot]
+        return None if proven != proven else float(proven) # nan : unknown
+
+    def set_proven(self, value):
         '''
-        evaluate_value(model : nn.Module) -> value : float 
+        set_proven(value : float) -> None
 
-        This method evaluates the value of the current node using MCTS.
-        The basic process involves traversing to a terminal node to obtain the game result.
-        If the current node is non-terminal and has no child nodes, 
+        A proven win of the node is a proven loss of its parent, so its w becomes inf and PUCT (q = -w / n) never selects it again.
+        '''
+        self.stats[3][self.slot] = value
+
+        if value == 1:
+            self.stats[1][self.slot] = np.inf
+
+    def evaluate_value(self, model, use_threats=USE_THREAT_DETECTION, table=None, cache=None, solver=USE_SOLVER):
+        '''
+        evaluate_value(model : nn.Module, use_threats : bool, table : TranspositionTable, cache : EvalCache, solver : bool) -> value : float 
+
+        This method runs a single playout from the current node and returns its value.
+        It walks down by PUCT recording the path, until a terminal node or a node without child nodes.
+        If the leaf is non-terminal and has no child nodes, 
         the neural network predicts the legal policy and value, serving as a replacement for rollout.
+        With use_threats, only the forced moves become child nodes, and a proven result replaces the nn.
+        With table, a transposed position takes the stored child nodes & nn value instead of the nn.
+        The value is backed up along the path, flipping its sign every ply.
+        With solver, a proven leaf (terminal or forced result) also proves its ancestors when their children decide them.
         '''
-        if self.state.is_done():
-            # judge current value
+        path = self.select_path()
+        leaf = path[-1]
+
+        value = leaf.evaluate_leaf(use_threats, table, solver)
+
+        if value is None:
+            legal_policy, value = predict(model, leaf.state, cache) # by using nn
+
+            if len(leaf.child_nodes) == 0:
+                leaf.expand(leaf.state.get_legal_actions(), legal_policy)
+
+                if table is not None:
+                    table.store(leaf.state, leaf, value)
+
+        # update : value of the leaf's player -> the current node's player
+        for node in reversed(path):
+            n, w = node.stats[:2]
+            n[node.slot] += 1
+            w[node.slot] += value
+            value = -value
+
+        if solver and leaf.proven is not None:
+            propagate_proven(path)
+
+        return -value
+
+    def is_done(self):
+        '''
+        is_done() -> bool
+
+        state.is_done() computed once and stored on the node.
+        '''
+        if self.done is None:
+            self.done = self.state.is_done()
+        return self.done
+
+    def evaluate_leaf(self, use_threats=USE_THREAT_DETECTION, table=None, solver=USE_SOLVER):
+        '''
+        evaluate_leaf(use_threats : bool, table : TranspositionTable, solver : bool) -> value : float | None
+
+        This method returns the value of a leaf known without the nn, or None when the nn is needed.
+        Terminal : -1 (lose) or 0 (draw). 
+        With table, a transposed position shares the child nodes of the stored node and returns its nn value.
+        With use_threats, forced moves are expanded here and their proven value is returned.
+        With solver, terminal & proven forced results are set as the proven result of the leaf.
+        '''
+        if self.is_done():
             value = -1 if self.state.is_lose() else 0 # 패배 혹은 무승부
+            if solver:
+                self.set_proven(value)
+            return value
 
-            # update
-            self.n += 1
-            self.w += value
+        entry = table.lookup(self.state) if table is not None else None
 
+        if entry is not None:
+            node, value = entry
+            self.child_nodes, self.child_stats = node.child_nodes, node.child_stats
             return value
 
-        # When child node does not exist.
-        if len(self.child_nodes) == 0:
-            legal_policy, value = predict(model, self.state) # by using nn
+        forced_actions, value = self.state.get_forced_actions() if use_threats else (None, None)
 
-            # update
-            self.n += 1
-            self.w += value
+        if forced_actions is not None:
+            self.expand(forced_actions, [1 / len(forced_actions)] * len(forced_actions))
 
-            # expand
-            for action, p in zip(self.state.get_legal_actions(), legal_policy):
-                self.child_nodes.append(Node(self.state.next(action), p))
+            if solver and value is not None:
+                self.set_proven(value)
 
-            return value
+        return value
 
-        # When child node exist
-        else:
-            value = - self._select_next_child_node().evaluate_value(model)
+    def expand(self, actions, priors):
+        '''
+        expand(actions : np.ndarray, priors : list[float]) -> None
+
+        Child nodes are made with their action only. (child states are made lazily)
+        '''
+        self.child_stats = (np.zeros(len(actions), dtype=np.int64), np.zeros(len(actions)), np.array(priors, dtype=np.float64), np.full(len(actions), np.nan))
+        self.child_nodes = [Node(None, None, action, self.child_stats, slot) for slot, action in enumerate(actions)]
 
-            # update
-            self.n += 1
-            self.w += value
+    def select_path(self):
+        '''
+        select_path() -> path : list[Node]
 
-            return value
+        This method descends by PUCT until a node without child nodes (a terminal node has none), 
+        making the state of each visited node on the way.
+        '''
+        node = self
+        path = [node]
+
+        while node.child_nodes:
+            child_node = node._select_next_child_node()
+
+            if child_node.state is None:
+                child_node.state = node.state.next(child_node.action)
+
+            node = child_node
+            path.append(node)
+
+        return path
+
+    def select_leaf(self):
+        '''
+        select_leaf() -> path : list[Node]
+
+        Same as select_path(), putting a virtual loss(a visit which lost) on every node of the path.
+        Virtual losses of the ancestors do not change the selection, because PUCT reads only the child stats.
+        '''
+        path = self.select_path()
+
+        for node in path:
+            add_virtual_loss(node)
+
+        return path
 
     def _select_next_child_node(self):
         '''
@@ -170,28 +607,115 @@ class Node:
 
         This method selects next child node by using PUCT algorithms.
         '''
-        total_visit = sum(get_n_child(self.child_nodes))
+        return self.child_nodes[select_puct(*self.child_stats[:3])]
+
+def in_budget(n_done, n_playout, deadline, root_n):
+    '''
+    in_budget(n_done : int, n_playout : int | float, deadline : float, root_n : int) -> bool
+
+    The search goes on until n_playout playouts or the deadline, 
+    but the root needs 2 visits at least (its own & a child's), so the policy always has a visited action.
+    '''
+    return n_done < n_playout and (root_n < 2 or time.perf_counter() < deadline)
+
+def select_puct(child_n, child_w, child_p):
+    '''
+    select_puct(child_n : np.ndarray, child_w : np.ndarray, child_p : np.ndarray) -> idx : int
+
+    PUCT of every child at once, q + C_PUCT * p * sqrt(total visit) / (1 + n) where q = -w / n (0 if not visited).
+    w of a child which is not visited is 0, so dividing by max(n, 1) keeps q = 0 without a branch.
+    '''
+    node_values = -child_w / np.maximum(child_n, 1) + (C_PUCT * sqrt(child_n.sum())) * child_p / (1 + child_n)
+
+    max_indices = np.flatnonzero(node_values == node_values.max())
+    if len(max_indices) == 1:
+        return int(max_indices[0])
+    return int(random.choice(max_indices))
+
+def add_virtual_loss(node):
+    # w is the value of node's player, so the parent sees a loss as -VIRTUAL_LOSS.
+    n, w = node.stats[:2]
+    n[node.slot] += 1
+    w[node.slot] += VIRTUAL_LOSS
+
+def revert_virtual_loss(path : list):
+    for node in path:
+        n, w = node.stats[:2]
+        n[node.slot] -= 1
+        w[node.slot] -= VIRTUAL_LOSS
+
+def backup(path : list, value : float):
+    '''
+    backup(path : list[Node], value : float) -> None
 
-        values = []
+    This method replaces the virtual losses of the path by the value of its leaf. (value flips its sign every depth)
+    '''
+    for node in reversed(path):
+        node.stats[1][node.slot] += value - VIRTUAL_LOSS
+        value = -value
 
-        for child_node in self.child_nodes:
-             # PUCT 
-            q_value = -(child_node.w / child_node.n) if child_node.n != 0 else 0
-            node_value = q_value + C_PUCT * child_node.p * sqrt(total_visit) / (1 + child_node.n)
-            values.append(node_value)
+def propagate_proven(path : list):
+    '''
+    propagate_proven(path : list[Node]) -> None
 
-        return self.child_nodes[argmax(values)]
+    This method proves the ancestors of the proven leaf of path, from its parent up, while their children decide them.
+    A child proven to lose (for its own player) proves a win, all children proven prove the best of their results.
+    '''
+    for node in reversed(path[:-1]):
+        if node.proven is not None:
+            return
+
+        child_proven = node.child_stats[3]
+
+        if (child_proven == -1).any():
+            node.set_proven(1)
+        elif not np.isnan(child_proven).any():
+            node.set_proven(-float(child_proven.min()))
+        else:
+            return
 
 def argmax(lst : list):
     '''
     argmax(lst : list)
 
     This method counts for multiple max value indices which np.argmax() cannot handle.
+    Ties are broken by random.choice(), so random.seed() makes them reproducible.
     '''
-    arr = np.array(lst)
-    max_indices = np.where(arr == arr.max())[0]
+    arr = np.asarray(lst)
+    max_indices = np.flatnonzero(arr == arr.max())
+
+    if len(max_indices) == 1:
+        return int(max_indices[0])
     return int(random.choice(max_indices)) 
 
+def get_n_legal(node):
+    '''
+    get_n_legal(node : Node) -> legal_n : list
+
+    This method gets visit cnt of every legal action of the node. (0 for the actions without child node)
+    When the node is proven, only the children reaching its result keep their visits (at least 1).
+    Otherwise the children proven to win (lose for the node) drop their visits, if the other children have some.
+    '''
+    if node.child_stats is None:
+        return [0] * len(node.state.get_legal_actions())
+
+    child_n, child_proven = node.child_stats[0], node.child_stats[3]
+
+    if node.proven is not None:
+        child_n = np.where(-child_proven == node.proven, np.maximum(child_n, 1), 0)
+
+    elif (child_proven == 1).any() and child_n[child_proven != 1].sum() > 0:
+        child_n = np.where(child_proven == 1, 0, child_n)
+
+    if len(node.child_nodes) == len(node.state.get_legal_actions()):
+        return child_n.tolist()
+
+    legal_n = [0] * len(node.state.get_legal_actions())
+    for child_node in node.child_nodes:
+        legal_n[node.state.get_action_slot(child_node.action)] = int(child_n[child_node.slot])
+
+    return legal_n
+
 def get_n_child(child_nodes : list):
     '''
     get_n_child(child_nodes : list[Node]) -> child_n : list
@@ -206,44 +730,94 @@ def get_n_child(child_nodes : list):
     return child_n
 
 
-def predict(model, state):
+def get_input_buffer(n_batch, n_channels, state_shape, device):
     '''
-    predict(model : nn.Module, state : class) -> legal_policy : list[float], value : float
+    get_input_buffer(n_batch : int, n_channels : int, state_shape : tuple, device : torch.device) -> x : torch.Tensor, x_array : np.ndarray
+
+    This method returns a float32 input tensor and the numpy view sharing its memory.
+    It is made once per shape & thread and reused by every predict() of the thread, so encoding a leaf allocates nothing.
+    Each thread (search threads' BatchEvaluator, ponder thread) has its own buffers, so concurrent predict() never share an input.
+    The tensor is pinned when the model is on cuda, so it can be copied with non_blocking=True.
+    '''
+    key = (n_batch, n_channels, tuple(state_shape), device.type == 'cuda')
+
+    if not hasattr(_input_buffers, 'buffers'):
+        _input_buffers.buffers = {}
+    buffers = _input_buffers.buffers
+
+    if key not in buffers:
+        x = torch.empty((n_batch, n_channels, *state_shape), dtype=torch.float32, pin_memory=key[-1])
+        buffers[key] = (x, x.numpy())
+
+    return buffers[key]
+
+# input buffers of each thread
+_input_buffers = threading.local()
+
+def predict(model, state, cache=None):
+    '''
+    predict(model : nn.Module, state : class, cache : EvalCache) -> legal_policy : list[float], value : float
 
     This method returns *legal* policy & value of current state.
     '''
-    # device
-    device = next(model.parameters()).device
+    legal_policies, values = predict_batch(model, [state], cache)
+    return legal_policies[0], values[0]
 
-    # reshape & put on device 
-    if ALLOW_TRANSPOSE:
-        idx = random.choice(range(8))
-        rotate_ftn, revert_ftn = get_dihedral_transpose_ftns(idx)
-        rotated_state = rotate_ftn(state()).copy()
-        x = torch.tensor(rotated_state, dtype=torch.float32, device=device).reshape(1,-1,*STATE_SHAPE) 
+def predict_batch(model, states, cache=None):
+    '''
+    predict_batch(model : nn.Module, states : list[class], cache : EvalCache) -> legal_policies : list[np.ndarray], values : list[float]
 
-        model.eval()
+    This method returns *legal* policy & value of every state by a single forward pass.
+    Only the states which are not in cache are evaluated by the nn. (cache=None evaluates all)
+    '''
+    entries = [cache.lookup(model, state) for state in states] if cache is not None else [None] * len(states)
+    missed = [idx for idx, entry in enumerate(entries) if entry is None]
 
-        with torch.no_grad():
-            raw_policy, value = model(x)
-            raw_policy, value = raw_policy.detach().cpu().numpy().reshape(-1,*STATE_SHAPE), float(value.detach())
-            reverted_raw_policy = revert_ftn(raw_policy).reshape(-1)
+    if len(missed) > 0:
+        raw_policies, values = forward_batch(model, [states[idx] for idx in missed])
 
-        # get legal policy
-        legal_policy = reverted_raw_policy[state.get_legal_actions()]
-        
+        for idx, raw_policy, value in zip(missed, raw_policies, values):
+            entries[idx] = (raw_policy, value)
+
+            if cache is not None:
+                cache.store(model, states[idx], raw_policy, value)
+
+    # get legal policy
+    legal_policies = [raw_policy[state.get_legal_actions()] for state, (raw_policy, _) in zip(states, entries)]
+
+    return legal_policies, [value for _, value in entries]
+
+def forward_batch(model, states):
+    '''
+    forward_batch(model : nn.Module, states : list[class]) -> raw_policies : np.ndarray (len(states), n_actions), values : list[float]
+
+    This method evaluates every state by a single forward pass. (policy over the whole action space)
+    '''
+    # device
+    device = next(model.parameters()).device
+
+    # encode states into the reused input buffer & put on device
+    state_shape = states[0].state_shape
+    x, x_array = get_input_buffer(len(states), len(states[0].features), state_shape, device)
+
+    if ALLOW_TRANSPOSE:
+        transpose_ftns = [get_dihedral_transpose_ftns(random.choice(get_symmetry_idxs(state_shape))) for _ in states]
+        for idx, (state, (rotate_ftn, _)) in enumerate(zip(states, transpose_ftns)):
+            x_array[idx] = rotate_ftn(state())
     else:
-        x = torch.tensor(state(), dtype=torch.float32, device=device).reshape(1,-1,*STATE_SHAPE) 
+        encode_states(states, x_array)
 
-        model.eval()
+    x = x.to(device, non_blocking=True)
 
-        with torch.no_grad():
-            raw_policy, value = model(x)
-            raw_policy, value = raw_policy.detach().cpu().numpy().reshape(-1), float(value.detach())
+    # eval() walks every submodule, so it is called only when the model was left in train mode
+    if model.training:
+        model.eval()
 
-        # get legal policy
-        legal_policy = raw_policy[state.get_legal_actions()]
-        # legal_policy /= sum(legal_policy) if sum(legal_policy) else 1
+    with torch.no_grad():
+        raw_policies, values = model(x)
+        raw_policies, values = raw_policies.detach().cpu().numpy().reshape(-1, 1, *state_shape), values.detach().cpu().numpy().reshape(-1)
 
-    return legal_policy, value
+    if ALLOW_TRANSPOSE:
+        raw_policies = np.stack([transpose_ftns[idx][1](raw_policy) for idx, raw_policy in enumerate(raw_policies)])
 
+    return raw_policies.reshape(len(states), -1), [float(value) for value in values]
@@ -0,0 +1,249 @@
+import sys
+import os
+import time
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import *
+from Omok.MCTS import *
+
+CHUNK_SIZE = 4096
+
+class ArrayTree:
+    '''
+    ArrayTree(capacity : int)
+
+    The ArrayTree class stores a MCTS tree in preallocated numpy arrays indexed by integer node id. (root is 0)
+    Children of a node are stored next to each other, first_child[node] ~ first_child[node] + n_children[node].
+    Storage grows by CHUNK_SIZE nodes, and reset() clears the tree in O(1) by reusing the arrays.
+
+    : main method :
+    reset(state) -> None
+    select_leaf() -> path
+    evaluate_leaf(node, use_threats) -> value
+    expand(node, actions, priors) -> None
+    backup(path, value) -> None
+    '''
+    def __init__(self, capacity=CHUNK_SIZE):
+        self.size = 0
+        self.capacity = 0
+
+        self.n = np.empty(0, dtype=np.int32) # n_visit
+        self.w = np.empty(0, dtype=np.float64) # cum weight
+        self.p = np.empty(0, dtype=np.float64) # prior prob
+        self.action = np.empty(0, dtype=np.int32) # action from parent node
+        self.first_child = np.empty(0, dtype=np.int32)
+        self.n_children = np.empty(0, dtype=np.int32)
+        self.states = [] # made lazily, when the search visits the node first
+
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        n_new = capacity - self.capacity
+
+        self.n = np.concatenate([self.n, np.empty(n_new, dtype=np.int32)])
+        self.w = np.concatenate([self.w, np.empty(n_new, dtype=np.float64)])
+        self.p = np.concatenate([self.p, np.empty(n_new, dtype=np.float64)])
+        self.action = np.concatenate([self.action, np.empty(n_new, dtype=np.int32)])
+        self.first_child = np.concatenate([self.first_child, np.empty(n_new, dtype=np.int32)])
+        self.n_children = np.concatenate([self.n_children, np.empty(n_new, dtype=np.int32)])
+        self.states.extend([None] * n_new)
+
+        self.capacity = capacity
+
+    def _add_nodes(self, n_nodes):
+        '''
+        _add_nodes(n_nodes : int) -> first : int
+
+        This method allocates n_nodes new nodes in a row, and returns the id of the first one.
+        '''
+        if self.size + n_nodes > self.capacity:
+            self._grow(self.capacity + CHUNK_SIZE * (1 + (self.size + n_nodes - self.capacity) // CHUNK_SIZE))
+
+        first = self.size
+        self.size += n_nodes
+
+        nodes = slice(first, self.size)
+        self.n[nodes] = 0
+        self.w[nodes] = 0
+        self.first_child[nodes] = -1
+        self.n_children[nodes] = 0
+
+        return first
+
+    def reset(self, state):
+        '''
+        reset(state : class) -> None
+
+        Old nodes are not cleared, they are overwritten when their ids are allocated again.
+        (their states are kept until then)
+        '''
+        self.size = 0
+
+        root = self._add_nodes(1)
+        self.p[root] = 1.0
+        self.action[root] = -1
+        self.states[root] = state
+
+    def get_root_n(self):
+        '''
+        get_root_n() -> legal_n : list
+
+        visit cnt of every legal action of the root. (0 for the actions without child node)
+        '''
+        state = self.states[0]
+        children = slice(self.first_child[0], self.first_child[0] + self.n_children[0])
+
+        # legal actions are in ascending order
+        legal_actions = state.get_legal_actions()
+        legal_n = np.zeros(len(legal_actions), dtype=np.int64)
+        legal_n[np.searchsorted(legal_actions, self.action[children])] = self.n[children]
+
+        return legal_n.tolist()
+
+    def expand(self, node, actions, priors):
+        '''
+        expand(node : int, actions : np.ndarray, priors : list[float]) -> None
+        '''
+        first = self._add_nodes(len(actions))
+        children = slice(first, self.size)
+
+        self.p[children] = priors
+        self.action[children] = actions
+        self.states[children] = [None] * len(actions)
+
+        self.first_child[node] = first
+        self.n_children[node] = len(actions)
+
+    def evaluate_leaf(self, node, use_threats=USE_THREAT_DETECTION):
+        '''
+        evaluate_leaf(node : int, use_threats : bool) -> value : float | None
+
+        Same as Node.evaluate_leaf(). value of a leaf known without the nn, or None when the nn is needed.
+        '''
+        state = self.states[node]
+
+        if state.is_done():
+            return -1 if state.is_lose() else 0 # 패배 혹은 무승부
+
+        forced_actions, value = state.get_forced_actions() if use_threats else (None, None)
+
+        if forced_actions is not None:
+            self.expand(node, forced_actions, [1 / len(forced_actions)] * len(forced_actions))
+
+        return value
+
+    def _select_next_child(self, node):
+        '''
+        _select_next_child(node : int) -> child : int
+
+        PUCT over the stat arrays of the children. (same as Node._select_next_child_node())
+        '''
+        first = self.first_child[node]
+        children = slice(first, first + self.n_children[node])
+
+        return first + select_puct(self.n[children], self.w[children], self.p[children])
+
+    def select_leaf(self):
+        '''
+        select_leaf() -> path : list[int]
+
+        Same as Node.select_leaf(). It descends by PUCT putting a virtual loss on every node of the path.
+        '''
+        node = 0
+        path = [node]
+
+        # only non-terminal nodes are expanded
+        while self.n_children[node] != 0:
+            child = self._select_next_child(node)
+
+            if self.states[child] is None:
+                self.states[child] = self.states[node].next(int(self.action[child]))
+
+            node = child
+            path.append(node)
+
+        self.n[path] += 1
+        self.w[path] += VIRTUAL_LOSS
+
+        return path
+
+    def revert_virtual_loss(self, path):
+        self.n[path] -= 1
+        self.w[path] -= VIRTUAL_LOSS
+
+    def backup(self, path, value):
+        '''
+        backup(path : list[int], value : float) -> None
+
+        This method replaces the virtual losses of the path by the value of its leaf. (value flips its sign every depth)
+        '''
+        signs = np.where(np.arange(len(path))[::-1] % 2 == 0, 1.0, -1.0)
+        self.w[path] += value * signs - VIRTUAL_LOSS
+
+
+class ArrayMCTS(MCTS):
+    '''
+    ArrayMCTS(n_playout : int, use_threats : bool, n_batch : int, time_limit : float, early_stop : bool, stop_confidence : float)
+
+    MCTS on ArrayTree instead of Node objects. It has the same interface as MCTS.
+    The tree is made once and reset between moves. (reuse_tree is not supported, so n_reused is always 0)
+    The MCTS-solver is not supported either. (use_solver=False)
+    '''
+    def __init__(self, n_playout, use_threats=USE_THREAT_DETECTION, n_batch=N_LEAF_BATCH, time_limit=None, 
+                 early_stop=EARLY_STOP, stop_confidence=STOP_CONFIDENCE):
+        super().__init__(n_playout, use_threats, n_batch, time_limit=time_limit, early_stop=early_stop, stop_confidence=stop_confidence,
+                         use_solver=False)
+        self.tree = ArrayTree()
+
+    def _search(self, state, model, greedy=False):
+        '''
+        _search(state : class, model : nn.Module, greedy : bool) -> childs_n : list
+
+        Same playouts as MCTS._search_batched(). (n_batch=1 makes the sequential search)
+        '''
+        tree = self.tree
+        tree.reset(state)
+        n_playout, deadline = self._get_budget()
+        n_done = 0
+        start = time.perf_counter()
+
+        while in_budget(n_done, n_playout, deadline, tree.n[0]):
+            if greedy and tree.n_children[0] != 0:
+                children = slice(tree.first_child[0], tree.first_child[0] + tree.n_children[0])
+                if self._is_decided((tree.n[children],), n_done, n_playout):
+                    break
+
+            leaves, paths = [], []
+
+            while len(leaves) < self.n_batch and n_done < n_playout:
+                path = tree.select_leaf()
+                leaf = path[-1]
+
+                if leaf in leaves:
+                    tree.revert_virtual_loss(path)
+                    break
+
+                n_done += 1
+                value = tree.evaluate_leaf(leaf, self.use_threats)
+
+                if value is None:
+                    leaves.append(leaf)
+                    paths.append(path)
+                else:
+                    tree.backup(path, value)
+
+            if len(leaves) == 0:
+                continue
+
+            legal_policies, values = predict_batch(model, [tree.states[leaf] for leaf in leaves], self.cache)
+
+            for leaf, path, legal_policy, value in zip(leaves, paths, legal_policies, values):
+                if tree.n_children[leaf] == 0:
+                    tree.expand(leaf, tree.states[leaf].get_legal_actions(), legal_policy)
+                tree.backup(path, value)
+
+        self._count_playouts(n_done, n_playout, start)
+
+        return tree.get_root_n()
@@ -0,0 +1,106 @@
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import *
+from Omok.lines import *
+
+class BatchedBoard:
+    '''
+    BatchedBoard(n_games : int, state_shape : tuple, winning_condition : int)
+
+    The BatchedBoard class holds N games as one (N, 2, *state_shape) uint8 array and advances them in lockstep.
+    boards[:, 0] is the stones of the first player, boards[:, 1] is the stones of the second player.
+
+    : main method :
+    step(actions) -> None
+    legal_mask() -> (N, n_actions) bool
+    terminal() -> (N,) bool
+    winner() -> (N,) int (0 : first player, 1 : second player, -1 : draw or not ended)
+    '''
+    def __init__(self, n_games, state_shape=STATE_SHAPE, winning_condition=WINNING_CONDITION):
+        self.n_games = n_games
+        self.state_shape = state_shape
+        self.n_actions = state_shape[0] * state_shape[1]
+        self.winning_condition = winning_condition
+
+        # every winning window of the board
+        self.lines, _ = get_winning_lines(state_shape, winning_condition)
+
+        self.reset()
+
+    def reset(self):
+        self.boards = np.zeros((self.n_games, 2, *self.state_shape), dtype=np.uint8)
+        self.n_stones = np.zeros(self.n_games, dtype=np.int64)
+        self.last_actions = np.full(self.n_games, -1, dtype=np.int64)
+        self.winners = np.full(self.n_games, -1, dtype=np.int64)
+        self.done = np.zeros(self.n_games, dtype=bool)
+
+    def current_player(self):
+        '''
+        current_player() -> (N,) int (0 : first player's turn, 1 : second player's turn)
+        '''
+        return self.n_stones % 2
+
+    def legal_mask(self):
+        '''
+        legal_mask() -> (N, n_actions) bool
+
+        Empty cells of each game. Ended games have no legal action.
+        '''
+        empty = (self.boards.reshape(self.n_games, 2, -1).max(axis=1) == 0)
+        empty[self.done] = False
+        return empty
+
+    def step(self, actions):
+        '''
+        step(actions : (N,) int) -> None
+
+        Every game which is not ended puts a stone of its current player on actions[game].
+        Actions of ended games are ignored.
+        '''
+        actions = np.asarray(actions, dtype=np.int64)
+        games = np.flatnonzero(~self.done)
+        if len(games) == 0:
+            return
+
+        actions, players = actions[games], self.current_player()[games]
+
+        flat_boards = self.boards.reshape(self.n_games, 2, -1)
+        if np.any(flat_boards[games, :, actions].max(axis=1) != 0):
+            raise ValueError(f"Illegal action in games {games[flat_boards[games, :, actions].max(axis=1) != 0].tolist()}")
+
+        flat_boards[games, players, actions] = 1
+        self.n_stones[games] += 1
+        self.last_actions[games] = actions
+
+        # sliding window over every line of the player who moved
+        is_win = flat_boards[games, players][:, self.lines].all(axis=2).any(axis=1)
+        self.winners[games[is_win]] = players[is_win]
+        self.done[games] = is_win | (self.n_stones[games] >= self.n_actions)
+
+    def terminal(self):
+        return self.done.copy()
+
+    def winner(self):
+        return self.winners.copy()
+
+    def get_state(self, idx, State):
+        '''
+        get_state(idx : int, State : class) -> state : State
+
+        This method converts game idx into a State (player = the player to move), so MCTS can search it.
+        '''
+        player = self.n_stones[idx] % 2
+        player_board = self.boards[idx, player].astype(np.float64)
+        enemy_board = self.boards[idx, 1 - player].astype(np.float64)
+
+        if self.last_actions[idx] < 0:
+            return State(player_board, enemy_board, state_shape=self.state_shape, winning_condition=self.winning_condition)
+
+        # State puts next_action on the enemy board by itself.
+        np.put(enemy_board, self.last_actions[idx], 0)
+        return State(player_board, enemy_board, next_action=int(self.last_actions[idx]), 
+                     state_shape=self.state_shape, winning_condition=self.winning_condition)
@@ -0,0 +1,152 @@
+import sys
+import os
+import weakref
+import numpy as np
+from collections import OrderedDict
+from itertools import count
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import *
+from Omok.zobrist import *
+
+class EvalCache:
+    '''
+    EvalCache(max_mb : float)
+
+    The EvalCache class keeps the nn outputs (raw policy, value) of positions between MCTS and the model.
+    A position is keyed by its canonical key (see BaseState.get_canonical_key()), so symmetric positions share one entry.
+    The policy is stored in the canonical orientation, and mapped back through the symmetry of each state on lookup.
+    Entries are evicted in least recently used order when they take more than max_mb.
+
+    Entries of a model are dropped when load_state_dict() changes its weights. (by a hook registered on the first lookup)
+    Weights changed in place (e.g. optimizer.step()) are not detected, so invalidate(model) has to be called after them.
+
+    : main method :
+    lookup(model, state) -> (raw_policy, value) | None
+    store(model, state, raw_policy, value) -> None
+    invalidate(model) -> None
+    get_stats() -> dict
+    '''
+    def __init__(self, max_mb=NN_CACHE_MB):
+        self.max_nbytes = int(max_mb * 2**20)
+        self.nbytes = 0
+        self.entries = OrderedDict()
+
+        # token of each model, renewed when its weights change
+        self.model_tokens = weakref.WeakKeyDictionary()
+        self.tokens = count()
+
+        self.hits = 0
+        self.misses = 0
+        self.n_invalidated = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _get_token(self, model):
+        if model not in self.model_tokens:
+            self.model_tokens[model] = next(self.tokens)
+            model.register_load_state_dict_post_hook(lambda module, incompatible_keys: self.invalidate(module))
+        return self.model_tokens[model]
+
+    def _get_key(self, model, state):
+        '''
+        _get_key(model : nn.Module, state : class) -> key : tuple, symmetry_cells : np.ndarray (n_cells,)
+
+        symmetry_cells[cell] is the cell of the canonical orientation.
+        Features with the last action (action, prev_enemy) also need the last action to be the same, so it joins the key.
+        Among the symmetries of a symmetric board, the one which maps the last action to the smallest cell is taken.
+        '''
+        # python ints are faster than numpy for 8 keys
+        keys = state.get_zobrist_keys().tolist()
+        canonical_key = min(keys)
+        symmetry_idxs = [idx for idx, key in enumerate(keys) if key == canonical_key]
+        all_symmetry_cells = get_symmetry_cells(state.state_shape)
+
+        action = -1
+        if state.next_action is not None and ('action' in state.features or 'prev_enemy' in state.features):
+            actions = [int(all_symmetry_cells[idx, state.next_action]) for idx in symmetry_idxs]
+            action = min(actions)
+            symmetry_idxs = [symmetry_idxs[actions.index(action)]]
+
+        key = (self._get_token(model), canonical_key, action, len(state.features))
+        return key, all_symmetry_cells[symmetry_idxs[0]]
+
+    def lookup(self, model, state):
+        '''
+        lookup(model : nn.Module, state : class) -> (raw_policy : np.ndarray (n_actions,), value : float) | None
+
+        raw_policy is in the orientation of state.
+        '''
+        key, symmetry_cells = self._get_key(model, state)
+        entry = self.entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+
+        canonical_policy, value = entry
+        return canonical_policy[symmetry_cells], value
+
+    def store(self, model, state, raw_policy, value):
+        '''
+        store(model : nn.Module, state : class, raw_policy : np.ndarray (n_actions,), value : float) -> None
+        '''
+        key, symmetry_cells = self._get_key(model, state)
+        if key in self.entries:
+            return
+
+        canonical_policy = np.empty(len(symmetry_cells), dtype=np.float32)
+        canonical_policy[symmetry_cells] = raw_policy
+
+        self.entries[key] = (canonical_policy, float(value))
+        self.nbytes += self._get_nbytes(key, canonical_policy)
+
+        while self.nbytes > self.max_nbytes and len(self.entries) > 0:
+            old_key, (old_policy, _) = self.entries.popitem(last=False)
+            self.nbytes -= self._get_nbytes(old_key, old_policy)
+
+    def _get_nbytes(self, key, canonical_policy):
+        return sys.getsizeof(key) + sys.getsizeof(canonical_policy)
+
+    def invalidate(self, model):
+        '''
+        invalidate(model : nn.Module) -> None
+
+        This method drops the entries of model. (its next lookups are made by the new weights)
+        '''
+        if model not in self.model_tokens:
+            return
+
+        token = self.model_tokens.pop(model)
+        self.model_tokens[model] = next(self.tokens)
+        self.n_invalidated += 1
+
+        for key in [key for key in self.entries if key[0] == token]:
+            self.nbytes -= self._get_nbytes(key, self.entries.pop(key)[0])
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def get_stats(self):
+        '''
+        get_stats() -> stats : dict (size, hits, misses, hit_rate, invalidated, nbytes)
+        '''
+        n_lookups = self.hits + self.misses
+
+        return {
+            'size' : len(self.entries),
+            'hits' : self.hits,
+            'misses' : self.misses,
+            'hit_rate' : self.hits / n_lookups if n_lookups else 0.0,
+            'invalidated' : self.n_invalidated,
+            'nbytes' : self.nbytes,
+        }
+
+# shared by every MCTS (Selfplay, EvalNetwork, BattleNN, web server), MCTS(use_nn_cache=False) does not use it.
+nn_cache = EvalCache(NN_CACHE_MB)
@@ -1,6 +1,7 @@
 import matplotlib.pyplot as plt
 
 from Omok.MCTS import *
+from Omok.parallelMCTS import *
 from Omok.state import *
 from utils.valid_tool import *
 from utils.saveLoad import *
@@ -26,8 +27,8 @@ class EvalNetwork:
         self.best_model = best_model
         self.recent_model = None
 
-        # MCTS instance 
-        self.mcts = MCTS(eval_count)
+        # MCTS instance (PARALLEL_EVAL : N_SEARCH_THREADS threads on one tree, not reproducible)
+        self.mcts = ParallelMCTS(eval_count, N_SEARCH_THREADS) if PARALLEL_EVAL else MCTS(eval_count)
 
         # init value
         self.updated = False
@@ -73,6 +74,7 @@ class EvalNetwork:
         next_actions = (next_actions_recent, next_actions_best)
 
         total_point = 0
+        n_searched, n_saved = self.mcts.n_searched, self.mcts.n_saved
 
         for i in range(self.eval_selfplay):
             if i % 2 == 0: # first player is latest model 
@@ -92,6 +94,11 @@ class EvalNetwork:
 
         print('Average Point of Latest Model', average_point)
 
+        # playouts saved by the early stop of greedy search (eval_temperature == 0)
+        n_searched, n_saved = self.mcts.n_searched - n_searched, self.mcts.n_saved - n_saved
+        if n_searched + n_saved > 0:
+            print(f"Playouts saved by early stop : {n_saved / (n_searched + n_saved):.1%} ({n_saved} / {n_searched + n_saved})")
+
         # visualize_game_result(self.game_result) # visualize circle graph 
 
         if average_point >= 0.55:
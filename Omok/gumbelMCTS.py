@@ -0,0 +1,197 @@
+import sys
+import os
+import time
+from math import ceil, log2
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import *
+from Omok.MCTS import *
+
+# sigma(q) = (C_VISIT + max visit of the root's children) * C_SCALE * q, q normalized to [0, 1]
+GUMBEL_C_VISIT = 50
+GUMBEL_C_SCALE = 0.1
+
+class GumbelMCTS(MCTS):
+    '''
+    GumbelMCTS(n_playout : int, n_sampled : int, **kwargs)
+
+    Gumbel root search (Gumbel AlphaZero) : strong moves & policy targets by a few playouts. (16 ~ 64)
+    The root samples n_sampled actions without replacement by gumbel-top-k of its nn policy (g + logits),
+    and sequential halving spreads n_playout playouts over them, dropping the worse half after each phase
+    by g + logits + sigma(q). The last one left is the action. (gumbel_action)
+    Below the root, the playouts walk down by PUCT as in MCTS.
+    improved_policy = softmax(logits + sigma(completed q)) is the policy target, where q of an unvisited action is the mixed value.
+    (see get_completed_q())
+    temp == 0 searches without the gumbel noise and returns the one-hot policy of the action, temp > 0 returns improved_policy.
+    kwargs are the params of MCTS. (the tree is not reused, each search starts from a fresh root)
+    '''
+    def __init__(self, n_playout, n_sampled=GUMBEL_N_SAMPLED, **kwargs):
+        if n_playout is None:
+            raise ValueError("GumbelMCTS needs n_playout.")
+
+        kwargs['reuse_tree'] = False
+        super().__init__(n_playout, **kwargs)
+        self.n_sampled = n_sampled
+
+        self.gumbel_action = None
+        self.improved_policy = None
+
+    def get_legal_policy(self, state, model, temp):
+        '''
+        get_legal_policy(state : class, model : nn.Module, temp : float) -> legal_policy : list[float]
+
+        Forced moves are handled by MCTS.get_legal_policy(). (gumbel_action = None)
+        '''
+        forced_actions, _ = state.get_forced_actions() if self.use_threats else (None, None)
+
+        if forced_actions is not None:
+            self.gumbel_action, self.improved_policy = None, None
+            return super().get_legal_policy(state, model, temp)
+
+        slot, self.improved_policy = self._search_gumbel(state, model, noise=(temp != 0))
+        self.gumbel_action = int(state.get_legal_actions()[slot])
+
+        if temp == 0:
+            legal_policy = np.zeros(len(self.improved_policy))
+            legal_policy[slot] = 1
+            return legal_policy
+
+        return self.improved_policy
+
+    def _search_gumbel(self, state, model, noise=True):
+        '''
+        _search_gumbel(state : class, model : nn.Module, noise : bool) -> slot : int, improved_policy : np.ndarray
+
+        This method runs the sequential halving of the root, and returns the slot of the chosen action & improved_policy.
+        Each round of a phase runs a playout under every action left, evaluated by a single nn call.
+        A phase of k actions gets max(1, n_playout // (n_phases * k)) rounds, the last phase takes the playouts left.
+        '''
+        start = time.perf_counter()
+
+        legal_policy, root_value = predict(model, state, self.cache)
+        root_node = Node(state, 1.0)
+        table = self.get_table(model, root_node)
+        root_node.expand(state.get_legal_actions(), legal_policy)
+        root_node.n, root_node.w = 1, root_value
+
+        logits = np.log(np.maximum(root_node.child_stats[2], 1e-12))
+        gumbels = np.random.gumbel(size=len(logits)) if noise else np.zeros(len(logits))
+
+        # gumbel-top-k
+        n_playout = self.n_playout
+        n_sampled = max(min(self.n_sampled, len(logits), n_playout), 1)
+        considered = np.argsort(-(gumbels + logits), kind='stable')[:n_sampled]
+
+        n_phases = max(ceil(log2(n_sampled)), 1)
+        n_done = 0
+
+        for phase in range(n_phases):
+            if phase == n_phases - 1:
+                n_rounds = max(ceil((n_playout - n_done) / len(considered)), 1)
+            else:
+                n_rounds = max(n_playout // (n_phases * len(considered)), 1)
+
+            for _ in range(n_rounds):
+                if n_done >= n_playout or root_node.proven is not None:
+                    break
+                n_done += self._run_round(root_node, considered[:n_playout - n_done], model, table)
+
+            if root_node.proven is not None:
+                break
+
+            # sequential halving
+            scores = gumbels + logits + self._sigma(get_completed_q(root_node, root_value), root_node.child_stats[0])
+            considered = considered[np.argsort(-scores[considered], kind='stable')[:max(len(considered) // 2, 1)]]
+
+        self._count_playouts(n_done, n_playout, start)
+
+        child_n, child_proven = root_node.child_stats[0], root_node.child_stats[3]
+        self.child_n = child_n.tolist()
+
+        if root_node.proven is not None:
+            # proven root : the best of the actions reaching its result
+            reaching = np.flatnonzero(-child_proven == root_node.proven)
+            slot = int(reaching[np.argmax((gumbels + logits)[reaching])])
+        else:
+            slot = int(considered[0])
+
+        improved_logits = logits + self._sigma(get_completed_q(root_node, root_value), child_n)
+        improved_policy = np.exp(improved_logits - improved_logits.max())
+
+        return slot, improved_policy / improved_policy.sum()
+
+    def _run_round(self, root_node, slots, model, table):
+        '''
+        _run_round(root_node : Node, slots : np.ndarray, model : nn.Module, table : TranspositionTable) -> n_done : int
+
+        This method runs a playout from each child of slots, collecting the leaves for a single nn call. (same as MCTS._search_batched())
+        '''
+        leaves, paths = [], []
+
+        for slot in slots:
+            child_node = root_node.child_nodes[slot]
+            if child_node.state is None:
+                child_node.state = root_node.state.next(child_node.action)
+
+            add_virtual_loss(root_node)
+            path = [root_node] + child_node.select_leaf()
+            leaf = path[-1]
+
+            value = leaf.evaluate_leaf(self.use_threats, table, self.use_solver)
+
+            if value is None:
+                leaves.append(leaf)
+                paths.append(path)
+            else:
+                backup(path, value)
+
+                if self.use_solver and leaf.proven is not None:
+                    propagate_proven(path)
+
+        if len(leaves) > 0:
+            legal_policies, values = predict_batch(model, [leaf.state for leaf in leaves], self.cache)
+
+            for leaf, path, legal_policy, value in zip(leaves, paths, legal_policies, values):
+                if len(leaf.child_nodes) == 0:
+                    leaf.expand(leaf.state.get_legal_actions(), legal_policy)
+
+                    if table is not None:
+                        table.store(leaf.state, leaf, value)
+                backup(path, value)
+
+        return len(slots)
+
+    def _sigma(self, q, child_n):
+        '''
+        _sigma(q : np.ndarray, child_n : np.ndarray) -> np.ndarray
+
+        monotone transform of q (normalized to [0, 1] by its min & max), growing with the visits of the root.
+        '''
+        q_min, q_max = q.min(), q.max()
+        q = (q - q_min) / max(q_max - q_min, 1e-8)
+
+        return (GUMBEL_C_VISIT + child_n.max()) * GUMBEL_C_SCALE * q
+
+def get_completed_q(root_node, root_value):
+    '''
+    get_completed_q(root_node : Node, root_value : float) -> q : np.ndarray
+
+    q of every child for the root's player : -w / n of the visited children, their result of the proven ones,
+    and the mixed value of the root for the unvisited children,
+    (root_value + sum(n) * policy-weighted q of the visited children) / (1 + sum(n)).
+    '''
+    child_n, child_w, child_p, child_proven = root_node.child_stats
+    visited = child_n > 0
+
+    q = np.zeros(len(child_n))
+    q[visited] = -child_w[visited] / child_n[visited]
+    q = np.where(np.isnan(child_proven), q, -child_proven)
+
+    if not visited.any():
+        return np.full(len(child_n), root_value)
+
+    visited_q = np.sum(child_p[visited] * q[visited]) / max(child_p[visited].sum(), 1e-12)
+    mixed_value = (root_value + child_n.sum() * visited_q) / (1 + child_n.sum())
+
+    return np.where(visited | ~np.isnan(child_proven), q, mixed_value)
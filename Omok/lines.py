@@ -0,0 +1,114 @@
+import sys
+import os
+import numpy as np
+from functools import lru_cache
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import *
+
+@lru_cache(maxsize=None)
+def get_winning_lines(state_shape=STATE_SHAPE, winning_condition=WINNING_CONDITION):
+    '''
+    get_winning_lines(state_shape : tuple, winning_condition : int) -> lines : np.ndarray, cell_lines : tuple[np.ndarray]
+
+    It is computed once per (state_shape, winning_condition).
+    lines      : (n_lines, winning_condition) every window of cells(flat index) which makes a win.
+    cell_lines : cell_lines[cell] is the indices of lines passing through the cell.
+    '''
+    nrow, ncol = state_shape
+    cells = np.arange(nrow * ncol).reshape(state_shape)
+    offsets = np.arange(winning_condition)
+
+    lines = []
+    for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)): # row, col, diag(↘), anti diag(↙)
+        for row in range(nrow):
+            for col in range(ncol):
+                end_row, end_col = row + d_row * (winning_condition - 1), col + d_col * (winning_condition - 1)
+                if 0 <= end_row < nrow and 0 <= end_col < ncol:
+                    lines.append(cells[row + d_row * offsets, col + d_col * offsets])
+
+    lines = np.array(lines, dtype=np.int64).reshape(-1, winning_condition)
+    lines.flags.writeable = False
+
+    cell_lines = tuple(np.flatnonzero((lines == cell).any(axis=1)) for cell in range(nrow * ncol))
+    for line_indices in cell_lines:
+        line_indices.flags.writeable = False
+
+    return lines, cell_lines
+
+def find_winning_line(board, winning_condition=WINNING_CONDITION, action=None):
+    '''
+    find_winning_line(board : np.ndarray, winning_condition : int, action : int) -> line : np.ndarray | None
+
+    board : (nrow, ncol) board of a single player.
+    This method returns the cells of the first completed line, or None.
+    When action is given, only the lines through the action are checked.
+    '''
+    board = np.asarray(board)
+    lines, cell_lines = get_winning_lines(board.shape, winning_condition)
+
+    if action is not None:
+        lines = lines[cell_lines[action]]
+
+    completed = board.reshape(-1)[lines].all(axis=1)
+
+    if not completed.any():
+        return None
+    return lines[np.argmax(completed)]
+
+THREAT_KINDS = ('five', 'four', 'open_four', 'open_three')
+
+def find_threats(board, other_board, winning_condition=WINNING_CONDITION, kinds=THREAT_KINDS):
+    '''
+    find_threats(board : np.ndarray, other_board : np.ndarray, winning_condition : int, kinds : tuple) -> threats : dict[str, np.ndarray]
+
+    board : (nrow, ncol) board of the player, other_board : board of the opponent.
+    Only the lines without the opponent's stone can be completed, so only they are counted.
+    threats[kind] is the empty cells(ascending) where the player makes
+    'five'       : a completed line.
+    'four'       : a line missing one cell. (five at the next turn)
+    'open_four'  : two or more new fives at the next turn, which can not be blocked at once.
+    'open_three' : an open four at the next turn.
+    Only the kinds asked are computed.
+    '''
+    board, other_board = np.asarray(board), np.asarray(other_board)
+    lines, _ = get_winning_lines(board.shape, winning_condition)
+    n_cells = board.size
+
+    stones = board.reshape(-1)[lines] != 0
+    is_free = ~(other_board.reshape(-1)[lines] != 0).any(axis=1)
+    n_stones = stones.sum(axis=1)
+
+    def get_empty_cells(n):
+        # (n_lines, winning_condition - n) empty cells of the free lines which have n stones
+        is_line = is_free & (n_stones == n)
+        return lines[is_line][~stones[is_line]].reshape(-1, winning_condition - n)
+
+    def to_cells(cells):
+        # ascending unique cells (np.unique is slow for small arrays)
+        return np.flatnonzero(np.bincount(cells.reshape(-1), minlength=n_cells))
+
+    threats = {kind : np.empty(0, dtype=np.int64) for kind in THREAT_KINDS}
+
+    if 'five' in kinds:
+        threats['five'] = to_cells(get_empty_cells(winning_condition - 1))
+
+    fours = get_empty_cells(winning_condition - 2) if 'four' in kinds or 'open_four' in kinds else np.empty((0, 2), dtype=np.int64)
+    if len(fours) > 0:
+        threats['four'] = to_cells(fours)
+
+        # open four : (cell, next five) pairs of the lines missing two cells
+        pairs = np.unique(np.concatenate([fours[:, 0] * n_cells + fours[:, 1], fours[:, 1] * n_cells + fours[:, 0]]))
+        n_fives = np.bincount(pairs // n_cells, minlength=n_cells)
+        threats['open_four'] = np.flatnonzero(n_fives >= 2)
+
+    threes = get_empty_cells(winning_condition - 3) if 'open_three' in kinds else np.empty((0, 3), dtype=np.int64)
+    if len(threes) > 0:
+        # open three : (cell, next cell, next five) triples of the lines missing three cells
+        triples = np.concatenate([(threes[:, i] * n_cells + threes[:, j]) * n_cells + threes[:, k] 
+                                  for i, j, k in ((0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0))])
+        cell_pairs, n_open_fours = np.unique(np.unique(triples) // n_cells, return_counts=True)
+        threats['open_three'] = to_cells(cell_pairs[n_open_fours >= 2] // n_cells)
+
+    return {kind : threats[kind] for kind in kinds}
@@ -0,0 +1,304 @@
+import sys
+import os
+import time
+import queue
+import random
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import *
+from Omok.MCTS import *
+from Omok.state import *
+
+class BatchEvaluator:
+    '''
+    BatchEvaluator(model : nn.Module, max_batch : int, cache : EvalCache, max_wait : float)
+
+    The BatchEvaluator class runs the nn in its own thread for the search threads.
+    evaluate(state) puts a request and blocks until the result is ready.
+    After the first request, each nn call waits up to max_wait sec for the others (up to max_batch requests).
+    torch releases the GIL during the forward pass, so the search threads walk the tree meanwhile.
+
+    : main method :
+    evaluate(state) -> (legal_policy, value)
+    close() -> None
+    '''
+    def __init__(self, model, max_batch, cache=None, max_wait=0.001):
+        self.model = model
+        self.max_batch = max_batch
+        self.cache = cache
+        self.max_wait = max_wait
+
+        self.requests = queue.Queue()
+        self.n_calls = 0
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def evaluate(self, state):
+        '''
+        evaluate(state : class) -> legal_policy : np.ndarray, value : float
+        '''
+        future = Future()
+        self.requests.put((state, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+
+            batch = [request]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    request = self.requests.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+
+                if request is None:
+                    self.requests.put(None) # close after this batch
+                    break
+                batch.append(request)
+
+            states, futures = zip(*batch)
+
+            try:
+                legal_policies, values = predict_batch(self.model, list(states), self.cache)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            self.n_calls += 1
+            for future, legal_policy, value in zip(futures, legal_policies, values):
+                future.set_result((legal_policy, value))
+
+    def close(self):
+        self.requests.put(None)
+        self.thread.join()
+
+
+class ParallelMCTS(MCTS):
+    '''
+    ParallelMCTS(n_playout : int, n_threads : int, **kwargs)
+
+    Tree-parallel MCTS : n_threads search threads descend the same tree and share one BatchEvaluator.
+    Each descent puts a virtual loss on its path, so the threads spread over different leaves.
+    A thread which reaches a leaf being evaluated by another thread waits for it, and descends again.
+    Walking down & backing up are short python sections under one tree lock (the GIL runs them one at a time anyway),
+    and the nn call is made out of the lock.
+    kwargs are the params of MCTS. (n_batch is not used, a batch is made of the waiting threads)
+    '''
+    def __init__(self, n_playout, n_threads=N_SEARCH_THREADS, **kwargs):
+        super().__init__(n_playout, **kwargs)
+        self.n_threads = n_threads
+
+        self.lock = threading.Lock()
+        self.n_nn_calls = 0
+
+    def _search(self, state, model, greedy=False):
+        '''
+        _search(state : class, model : nn.Module, greedy : bool) -> childs_n : list
+
+        Same as MCTS._search(), by n_threads search threads.
+        '''
+        root_node = self._get_root_node(state, model)
+        self.n_reused = root_node.n
+
+        n_playout, deadline = self._get_budget()
+        table = self.get_table(model, root_node)
+        start = time.perf_counter()
+
+        # shared by the search threads
+        self.n_started = 0
+        self.pending = {} # id(leaf) -> threading.Event set when the leaf is expanded
+        self.errors = []
+
+        evaluator = BatchEvaluator(model, self.n_threads, self.cache)
+        threads = [threading.Thread(target=self._run_search_thread, args=(root_node, evaluator, table, n_playout, deadline, greedy))
+                   for _ in range(self.n_threads)]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        evaluator.close()
+        self.n_nn_calls += evaluator.n_calls
+
+        if self.errors:
+            raise self.errors[0]
+
+        self._count_playouts(self.n_started, n_playout, start)
+
+        if self.reuse_tree:
+            self.root_nodes[id(model)] = root_node
+
+        return get_n_legal(root_node)
+
+    def _run_search_thread(self, root_node, evaluator, table, n_playout, deadline, greedy):
+        '''
+        _run_search_thread(root_node : Node, evaluator : BatchEvaluator, table : TranspositionTable, n_playout : int, deadline : float, greedy : bool) -> None
+
+        This method runs playouts until the budget of the search is spent.
+        '''
+        try:
+            while True:
+                with self.lock:
+                    if not in_budget(self.n_started, n_playout, deadline, root_node.n) or root_node.proven is not None or \
+                       (greedy and self._is_decided(root_node.child_stats, self.n_started, n_playout)):
+                        return
+
+                    path = root_node.select_leaf()
+                    leaf = path[-1]
+
+                    # another thread is evaluating the leaf
+                    if id(leaf) in self.pending:
+                        revert_virtual_loss(path)
+                        expanded = self.pending[id(leaf)]
+                        value = None
+
+                    else:
+                        expanded = None
+                        self.n_started += 1
+                        value = leaf.evaluate_leaf(self.use_threats, table, self.use_solver)
+
+                        if value is not None:
+                            backup(path, value)
+
+                            if self.use_solver and leaf.proven is not None:
+                                propagate_proven(path)
+                            continue
+
+                        self.pending[id(leaf)] = threading.Event()
+
+                if expanded is not None:
+                    expanded.wait()
+                    continue
+
+                try:
+                    legal_policy, value = evaluator.evaluate(leaf.state)
+
+                    with self.lock:
+                        if len(leaf.child_nodes) == 0:
+                            leaf.expand(leaf.state.get_legal_actions(), legal_policy)
+
+                            if table is not None:
+                                table.store(leaf.state, leaf, value)
+                        backup(path, value)
+
+                finally:
+                    with self.lock:
+                        self.pending.pop(id(leaf)).set()
+
+        except Exception as e:
+            self.errors.append(e)
+
+
+class RootParallelMCTS(MCTS):
+    '''
+    RootParallelMCTS(n_playout : int, n_workers : int, seed : int, **kwargs)
+
+    Root-parallel MCTS : n_workers processes search the same state independently, each by its own MCTS(n_playout, **kwargs),
+    and the visits of their roots are summed before boltzmann_dist() / argmax in get_legal_policy().
+    The searches differ by their seeds (random symmetries of the nn input, ties of the selection).
+    Each search of a worker starts from a fresh tree (reuse_tree=False, transposition table dropped),
+    so every search is an independent search of n_playout playouts, whichever worker takes it.
+    Each worker receives the model once, when the pool of the model is started by its first search.
+    reset_tree() closes the pools. (the next search sends the current weights)
+    close() has to be called when the searches are over.
+    '''
+    def __init__(self, n_playout, n_workers=N_SEARCH_WORKERS, seed=0, **kwargs):
+        super().__init__(n_playout, **kwargs)
+        self.n_workers = n_workers
+        self.seed = seed
+        self.worker_kwargs = dict(kwargs, n_playout=n_playout, reuse_tree=False, count_reused=False)
+
+        # pool of each model (by id), the model is kept with it so its id is not reused
+        self.pools = {}
+        self.n_searches = 0
+
+    def _get_pool(self, model):
+        if id(model) not in self.pools:
+            pool = ProcessPoolExecutor(self.n_workers, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_init_worker, initargs=(model, self.worker_kwargs))
+            self.pools[id(model)] = (model, pool)
+        return self.pools[id(model)][1]
+
+    def _search(self, state, model, greedy=False):
+        '''
+        _search(state : class, model : nn.Module, greedy : bool) -> childs_n : list
+
+        Same as MCTS._search(), childs_n is the sum of the workers' visits.
+        '''
+        pool = self._get_pool(model)
+        start = time.perf_counter()
+
+        seeds = [self.seed + self.n_searches * self.n_workers + worker for worker in range(self.n_workers)]
+        self.n_searches += 1
+
+        packed_state = pack_state(state)
+        futures = [pool.submit(_search_in_worker, packed_state, seed, greedy) for seed in seeds]
+        results = [future.result() for future in futures]
+
+        n_playout = self.n_playout * self.n_workers if self.n_playout is not None else float('inf')
+        self._count_playouts(sum(n_done for _, n_done in results), n_playout, start)
+
+        return np.sum([childs_n for childs_n, _ in results], axis=0).tolist()
+
+    def reset_tree(self):
+        super().reset_tree()
+        self.close()
+
+    def close(self):
+        for _, pool in self.pools.values():
+            pool.shutdown()
+        self.pools.clear()
+
+def pack_state(state):
+    '''
+    pack_state(state : class) -> packed_state : tuple
+
+    The state classes are made by select_state(), so a state is sent to the workers as its boards & class params.
+    '''
+    enemy_state = state.enemy_state.copy()
+    if state.next_action is not None:
+        np.put(enemy_state, state.next_action, 0)
+
+    return (len(state.features), isinstance(state, BitboardState), state.state_shape, state.winning_condition,
+            state.player_state, enemy_state, state.next_action)
+
+def unpack_state(packed_state):
+    '''
+    unpack_state(packed_state : tuple) -> state : class
+    '''
+    n_dim, bitboard, state_shape, winning_condition, player_state, enemy_state, next_action = packed_state
+    State = select_state(n_dim, bitboard, state_shape, winning_condition)
+
+    return State(player_state, enemy_state, next_action)
+
+# model & MCTS of a worker process of RootParallelMCTS
+_worker = {}
+
+def _init_worker(model, mcts_kwargs):
+    torch.set_num_threads(1) # one core per worker
+    model.eval()
+
+    _worker['model'] = model
+    _worker['mcts'] = MCTS(**mcts_kwargs)
+
+def _search_in_worker(packed_state, seed, greedy):
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+    mcts = _worker['mcts']
+    mcts.reset_tree() # the transposition table of the previous search
+    childs_n = mcts._search(unpack_state(packed_state), _worker['model'], greedy)
+
+    return childs_n, mcts.n_playouts_done
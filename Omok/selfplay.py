@@ -4,23 +4,28 @@ from abc import ABC, abstractmethod
 from config import *
 from Omok.state import *
 from Omok.MCTS import *
+from Omok.gumbelMCTS import *
 from utils.transpose_state import *
 
 State = select_state(STATE_DIM)
 
 class Selfplay(ABC):
     '''
-    SelfPlay(model : nn.Module, temp : float, n_selfplay : int, n_playout : int)
+    SelfPlay(model : nn.Module, temp : float, n_selfplay : int, n_playout : int, playout_cap : bool, use_gumbel : bool)
 
     The SelfPlay class conducts selfplay of AlphaZero. 
+    playout_cap=True randomizes the playouts of each move. (see _set_playout_cap())
+    use_gumbel=True searches by GumbelMCTS instead of MCTS. (see _get_policy_and_action())
     '''
-    def __init__(self, model, temp, n_selfplay, n_playout):
+    def __init__(self, model, temp, n_selfplay, n_playout, playout_cap=PLAYOUT_CAP_RANDOMIZATION, use_gumbel=USE_GUMBEL):
         # model
         self.model = model
 
         # params
         self.n_selfplay = n_selfplay
         self.n_playout = n_playout
+        self.playout_cap = playout_cap
+        self.use_gumbel = use_gumbel
 
         #  temps
         self.temp = temp
@@ -28,6 +33,7 @@ class Selfplay(ABC):
         # selfPlay's yield
         self.history = deque(maxlen=MEM_SIZE)
         self.n_steps = []
+        self.n_full_searches = 0
 
         # mcts instance should reset 
         self.mcts = None 
@@ -54,6 +60,38 @@ class Selfplay(ABC):
         '''
         pass
 
+    def _set_playout_cap(self):
+        '''
+        _set_playout_cap() -> full_search : bool
+
+        Playout cap randomization : a move is searched by n_playout playouts with FULL_SEARCH_PROB, else by N_FAST_PLAYOUT playouts.
+        Only the moves of full searches are policy targets, the others are recorded with a zero policy. (skipped by the policy loss)
+        Every move is a full search when playout_cap=False.
+        '''
+        full_search = not self.playout_cap or np.random.random() < FULL_SEARCH_PROB
+        self.mcts.n_playout = self.n_playout if full_search else N_FAST_PLAYOUT
+        self.n_full_searches += full_search
+
+        return full_search
+
+    def _get_policy_and_action(self, state, temp):
+        '''
+        _get_policy_and_action(state : class, temp : float) -> legal_policy : np.ndarray, action : int
+
+        MCTS : dirichlet noise is mixed into the policy of the search, which is recorded and the action is sampled from.
+        GumbelMCTS : the improved policy is recorded, and the action is the one left by the sequential halving.
+        (its gumbel noise is the exploration, temp == 0 searches without it)
+        '''
+        legal_policy = np.array(self.mcts.get_legal_policy(state, self.model, temp))
+
+        if self.use_gumbel and self.mcts.gumbel_action is not None:
+            return self.mcts.improved_policy, self.mcts.gumbel_action
+
+        nosie = np.random.dirichlet(0.3*np.ones(len(legal_policy)))
+        legal_policy = 0.75*legal_policy + 0.25*nosie
+
+        return legal_policy, np.random.choice(state.get_legal_actions(), p=legal_policy)
+
     def _self_play(self):
         '''
         _self_play() -> None
@@ -63,22 +101,43 @@ class Selfplay(ABC):
         '''
         for i in range(self.n_selfplay):
             self._single_play()
-            print(f"self play :  {self.idx * self.n_selfplay + i+1} / {TOTAL_SELFPLAY} | n_steps : {self.n_steps[-1]}")
+            print(f"self play :  {self.idx * self.n_selfplay + i+1} / {TOTAL_SELFPLAY} | n_steps : {self.n_steps[-1]}" + self._get_search_info())
+
+    def _get_search_info(self):
+        '''
+        _get_search_info() -> info : str
+
+        share of full searches (only with the playout cap), playouts/sec & transposition table stats of the mcts. (only when the table is used)
+        '''
+        info = ""
+        if self.playout_cap:
+            info += f" | full searches : {self.n_full_searches / sum(self.n_steps):.2f}"
+
+        if not self.mcts.use_transposition:
+            return info
+
+        stats = self.mcts.get_search_stats()
+        return info + f" | {stats['playouts_per_sec']:.1f} playouts/s | tt hit rate : {stats['tt_hit_rate']:.3f} | tt size : {stats['tt_size']} ({stats['tt_nbytes'] / 2**20:.1f} MB)"
 
     def __call__(self, idx):
         self.idx = idx
-        self.mcts = MCTS(self.n_playout)
+        self.mcts = GumbelMCTS(self.n_playout) if self.use_gumbel else MCTS(self.n_playout)
         self._self_play()
 
     def update_model(self, model):
         self.model.load_state_dict(model.state_dict())
 
+        # kept trees & transposition tables have the values of the old weights
+        if self.mcts is not None:
+            self.mcts.reset_tree()
+
     def _get_transposed_history(self, hist):
         state, policy, value = hist
-        policy = policy.reshape(-1,*STATE_SHAPE)
-        states_lst = [ftn(state) for ftn in rotate_ftns]
-        policy_lst = [ftn(policy).reshape(-1) for ftn in rotate_ftns]
-        value_lst = [value] * len(rotate_ftns)
+        policy = policy.reshape(-1, *state.shape[1:])
+        ftns = [get_dihedral_transpose_ftns(idx)[0] for idx in get_symmetry_idxs(state.shape[1:])[1:]]
+        states_lst = [ftn(state) for ftn in ftns]
+        policy_lst = [ftn(policy).reshape(-1) for ftn in ftns]
+        value_lst = [value] * len(ftns)
         
         for h in zip(states_lst, policy_lst, value_lst):
             self.history.append(h)
@@ -101,18 +160,14 @@ def get_selfplay_class():
                 learned_policy = np.zeros([state.n_actions]) 
 
                 legal_actions = state.get_legal_actions()
-                legal_policy = np.array(self.mcts.get_legal_policy(state, self.model, self.temp))
-
-                nosie = np.random.dirichlet(0.3*np.ones(len(legal_policy)))
-                legal_policy = 0.75*legal_policy + 0.25*nosie
+                full_search = self._set_playout_cap()
+                legal_policy, action = self._get_policy_and_action(state, self.temp)
 
-                learned_policy[legal_actions] = legal_policy
+                if full_search:
+                    learned_policy[legal_actions] = legal_policy
                 
                 history.append([state(), learned_policy, None]) 
 
-                # get legal action 
-                action = np.random.choice(legal_actions, p=legal_policy)
-
                 # step
                 state = state.next(action)
                 n_steps += 1 
@@ -146,22 +201,19 @@ def get_selfplay_class():
                 # get policy of current state 
                 learned_policy = np.zeros([state.n_actions]) # init value
                 legal_actions = state.get_legal_actions()
+                full_search = self._set_playout_cap()
 
                 if n_steps < EXPLORE_REGULATION:
-                    legal_policy = np.array(self.mcts.get_legal_policy(state, self.model, self.temp))
+                    legal_policy, action = self._get_policy_and_action(state, self.temp)
 
                 else:
-                    legal_policy = self.mcts.get_legal_policy(state, self.model, 0) 
+                    legal_policy, action = self._get_policy_and_action(state, 0)
 
-                nosie = np.random.dirichlet(0.3*np.ones(len(legal_policy)))
-                legal_policy = 0.75*legal_policy + 0.25*nosie
-                learned_policy[legal_actions] = legal_policy
+                if full_search:
+                    learned_policy[legal_actions] = legal_policy
                 
                 history.append([state(), learned_policy, None]) 
 
-                # get legal action 
-                action = np.random.choice(legal_actions, p=legal_policy)
-
                 # step
                 state = state.next(action)
                 n_steps += 1 
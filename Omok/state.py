@@ -3,10 +3,13 @@ import os
 import copy
 import numpy as np
 from abc import ABC, abstractmethod
+from functools import lru_cache
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from config import *
+from Omok.lines import *
+from Omok.zobrist import *
 
 class BaseState(ABC):
     '''
@@ -14,161 +17,147 @@ class BaseState(ABC):
     This abstract class bulids whole state except __call__() which makes state for train.  
     '''
     __slots__ = ('player_state', 'enemy_state', 'next_action', 'state_shape', 
-                 'action_space', 'n_actions', 'winning_condition', 'done_condition')
+                 'action_space', 'n_actions', 'winning_condition', 'done_condition', 'n_stones',
+                 'legal_actions', 'action_slots', 'zobrist_keys')
+
+    # board geometry used when it is not given. (select_state() sets them per class)
+    default_state_shape = STATE_SHAPE
+    default_winning_condition = WINNING_CONDITION
     
-    def __init__(self, player_state=None, enemy_state=None, next_action=None, state_shape=STATE_SHAPE):
+    def __init__(self, player_state=None, enemy_state=None, next_action=None, state_shape=None, winning_condition=None):
+        # state shape
+        self.state_shape = self.default_state_shape if state_shape is None else tuple(state_shape)
+
         # player, enemy's action
-        self.player_state = np.zeros(shape=state_shape) if player_state is None else copy.deepcopy(player_state) 
-        self.enemy_state = np.zeros(state_shape) if enemy_state is None else copy.deepcopy(enemy_state)
+        self.player_state = np.zeros(shape=self.state_shape) if player_state is None else copy.deepcopy(player_state) 
+        self.enemy_state = np.zeros(self.state_shape) if enemy_state is None else copy.deepcopy(enemy_state)
         if next_action is not None:
             np.put(self.enemy_state, next_action, 1) 
 
         self.next_action = next_action
 
-        # state shape
-        self.state_shape = state_shape
-
         # state info about action space
         self.action_space = range(self.state_shape[0]*self.state_shape[1])
         self.n_actions = len(self.action_space)
 
         # calculate legal actions
-        self.winning_condition = WINNING_CONDITION
+        self.winning_condition = self.default_winning_condition if winning_condition is None else winning_condition
 
         self.done_condition = [None] * 3 # win, draw, lose 
 
-    def next(self, action : int):
-        return self.__class__(self.enemy_state, self.player_state, next_action=action)
-
-    def get_legal_actions(self):
-        my_actions_set = set(np.where(self.player_state.reshape(-1) != 0)[0])
-        enemy_actions_set = set(np.where(self.enemy_state.reshape(-1) != 0)[0])
-
-        return list(set(self.action_space) - my_actions_set - enemy_actions_set)
+        self.n_stones = int(np.count_nonzero(self.player_state) + np.count_nonzero(self.enemy_state))
 
-    def _check_row_consecutive(self, single_arr):
-        if np.sum(single_arr) < self.winning_condition:
-            return False
+        # empty cells (ascending order) & action -> slot of empty cells
+        self.legal_actions = None
+        self.action_slots = None
 
-        if (len(single_arr) == self.winning_condition) & (np.sum(single_arr) == self.winning_condition):
-            return True
+        # zobrist keys of the board & its symmetric boards
+        self.zobrist_keys = None
 
-        for i in range(len(single_arr) - self.winning_condition + 1):
-            if all(single_arr[i:i+self.winning_condition]):    
-                return True
-        return False
+    def next(self, action : int):
+        state = self.__class__(self.enemy_state, self.player_state, next_action=action, 
+                               state_shape=self.state_shape, winning_condition=self.winning_condition)
+        self._link_next_state(state, action)
+        return state
 
-    def _make_diag_mask(self):
-        mask = np.zeros(shape=STATE_SHAPE, dtype=bool)
-        mask[:, -(self.winning_condition-1):] = 1
-        return mask
+    def _link_next_state(self, state, action):
+        '''
+        _link_next_state(state : class, action : int) -> None
 
-    def _check_winning_condition(self, board):
-        def _get_mask(indices):
-            mask = np.zeros(shape=N_ACTIONS)
-            mask[indices] = 1
-            return mask.astype(bool).reshape(STATE_SHAPE)
+        The next state inherits what this state already knows instead of computing it again.
+        '''
+        # player of the next state is enemy of this state.
+        state.done_condition[0] = self.is_lose()
 
-        # mask & unavailble idx list 
-        diag_mask = self._make_diag_mask()
-        anti_diag_mask = diag_mask[:,::-1]
+        legal_actions = self.get_legal_actions()
+        state.legal_actions = np.delete(legal_actions, np.searchsorted(legal_actions, action))
+        state.legal_actions.flags.writeable = False
 
-        diag_idx_list = list(np.arange(N_ACTIONS).reshape(STATE_SHAPE)[diag_mask])
-        anti_diag_idx_list = list(np.arange(N_ACTIONS).reshape(STATE_SHAPE)[anti_diag_mask])
+        color = 0 if self.is_first_player() else 1
+        state.zobrist_keys = self.get_zobrist_keys() ^ get_zobrist_table(self.state_shape)[color, :, action]
+        state.zobrist_keys.flags.writeable = False
 
-        # 
-        board = board.astype(bool)
+    def _find_legal_actions(self):
+        return np.flatnonzero((self.player_state.reshape(-1) == 0) & (self.enemy_state.reshape(-1) == 0))
 
-        # 조기 종료 
-        if np.sum(board) < self.winning_condition:
-            return False
-        
-        # row wise 
-        count_five = np.sum(board, axis=1)
-        if np.any(count_five >= self.winning_condition):
-            is_row = np.any(np.apply_along_axis(lambda x: self._check_row_consecutive(x), axis=1, arr=board))
-            if is_row:
-                return True
+    def get_legal_actions(self):
+        '''
+        get_legal_actions() -> legal_actions : np.ndarray (read only)
+
+        Empty cells in ascending order. The order is same as the order of legal policy & child nodes.
+        '''
+        if self.legal_actions is None:
+            self.legal_actions = self._find_legal_actions()
+            self.legal_actions.flags.writeable = False
+        return self.legal_actions
+
+    def get_action_slot(self, action : int):
+        '''
+        get_action_slot(action : int) -> slot : int
+
+        This method returns the index of action in get_legal_actions(). (-1 when action is not legal)
+        '''
+        if self.action_slots is None:
+            legal_actions = self.get_legal_actions()
+            self.action_slots = np.full(self.n_actions, -1)
+            self.action_slots[legal_actions] = np.arange(len(legal_actions))
+        return int(self.action_slots[action])
+
+    def get_zobrist_keys(self):
+        '''
+        get_zobrist_keys() -> keys : np.ndarray (n_symmetry,) (read only)
+
+        keys[i] is the zobrist key of this board seen through get_dihedral_transpose_ftns(get_symmetry_idxs(state_shape)[i]).
+        keys[0] is the key of this board itself.
+        '''
+        if self.zobrist_keys is None:
+            first_board, second_board = (self.player_state, self.enemy_state) if self.is_first_player() else (self.enemy_state, self.player_state)
+            self.zobrist_keys = compute_zobrist_keys(first_board, second_board, self.state_shape)
+            self.zobrist_keys.flags.writeable = False
+        return self.zobrist_keys
+
+    def get_zobrist_key(self):
+        return int(self.get_zobrist_keys()[0])
+
+    def get_canonical_key(self):
+        '''
+        get_canonical_key() -> (key : int, symmetry_idx : int)
+
+        The smallest key among the symmetric boards, so symmetric boards share the same key.
+        symmetry_idx is the symmetry which maps this board to the canonical board.
+        '''
+        keys = self.get_zobrist_keys()
+        symmetry_idx = int(np.argmin(keys))
+        return int(keys[symmetry_idx]), symmetry_idx
 
-        # col wise
-        count_five = np.sum(board, axis=0)
-        if np.any(count_five >= self.winning_condition):
-            is_col = np.any(np.apply_along_axis(lambda x: self._check_row_consecutive(x), axis=0, arr=board))
-            if is_col:
-                return True
-        
-        # 대각 조건이 맞는지 
-        indices = np.arange(N_ACTIONS)[board.reshape(-1)] 
-
-        for index in indices:
-            if index not in anti_diag_idx_list:
-                anti_diag_lst = list(range(index, index+(self.winning_condition-1)*(STATE_SHAPE[1]-1)+1, STATE_SHAPE[1]-1))
-                if max(anti_diag_lst) < N_ACTIONS:
-                    anti_diag_mask = _get_mask(anti_diag_lst)
-                    is_anti_diag = board[anti_diag_mask].all()
-
-                    if is_anti_diag:
-                        return True 
-                
-            if index not in diag_idx_list:
-                diag_lst = list(range(index, index+(self.winning_condition-1)*(STATE_SHAPE[1]+1)+1, STATE_SHAPE[1]+1))
-                if max(diag_lst) < N_ACTIONS:
-                    diag_mask = _get_mask(diag_lst)
-                    is_diag = board[diag_mask].all()
-
-                    if is_diag:
-                        return True 
-                
-        return False
+    def _check_winning_condition(self, board):
+        return find_winning_line(board, self.winning_condition) is not None
 
     def _check_winning_condition_with_action(self, board):
-        if np.sum(board) < self.winning_condition:
-            return False
-        
-        row, col = divmod(self.next_action, STATE_SHAPE[1])
-
-        # 가로 검사
-        if self._check_row_consecutive(board[row, :]):
-            return True
-
-        # 세로 검사
-        if self._check_row_consecutive(board[:, col]):
-            return True
-
-        # 정 대각선 (↘) 검사: np.diagonal() 활용
-        is_diag = self._check_row_consecutive(np.diagonal(board, offset=col - row))
-        if is_diag:
-            return True
-
-        # 반대 대각선 (↙) 검사: np.diagonal() 활용 (우상향 대각선)
-        flipped_board = np.fliplr(board)  # 보드를 좌우 반전하여 반대 대각선 ↙을 주 대각선 ↘으로 변환
-        anti_diag_values = np.diag(flipped_board, k=STATE_SHAPE[1] - 1 - (col + row))
-
-        is_anti_diag = self._check_row_consecutive(anti_diag_values)
-        if is_anti_diag:
-            return True
-
-        return False
+        '''
+        Only the lines through next_action can be completed by next_action.
+        '''
+        return find_winning_line(board, self.winning_condition, action=self.next_action) is not None
 
     def is_win(self):
-        condition = self._check_winning_condition(self.player_state) 
-        self.done_condition[0] = condition
-        return condition
+        if self.done_condition[0] is None:
+            self.done_condition[0] = self._check_winning_condition(self.player_state) 
+        return self.done_condition[0]
 
     def is_draw(self):
-        condition = (np.sum(self.player_state) + np.sum(self.enemy_state)) >= self.n_actions
-        self.done_condition[1] = condition
-        return condition
+        if self.done_condition[1] is None:
+            self.done_condition[1] = self.n_stones >= self.n_actions
+        return self.done_condition[1]
 
     def is_lose(self):
-        condition = self._check_winning_condition(self.enemy_state) if self.next_action is None else self._check_winning_condition_with_action(self.enemy_state)
-        self.done_condition[2] = condition
-        return condition
+        if self.done_condition[2] is None:
+            self.done_condition[2] = self._check_winning_condition(self.enemy_state) if self.next_action is None else self._check_winning_condition_with_action(self.enemy_state)
+        return self.done_condition[2]
 
     def is_done(self):
-        if any(self.done_condition):
-            return True  
-
+        '''
+        Each condition is computed once and cached in done_condition.
+        '''
         if self.is_win():
             return True
         if self.is_draw():
@@ -177,10 +166,49 @@ class BaseState(ABC):
             return True
 
         return False
-            
+
+    def get_threats(self, kinds=THREAT_KINDS):
+        '''
+        get_threats(kinds : tuple) -> (player_threats, enemy_threats) : tuple[dict[str, np.ndarray]]
+
+        Fives, fours, open fours & open threes which each side can make on the current board. (see find_threats())
+        '''
+        player_board, enemy_board = self._get_boards()
+        return (find_threats(player_board, enemy_board, self.winning_condition, kinds),
+                find_threats(enemy_board, player_board, self.winning_condition, kinds))
+
+    def get_forced_actions(self):
+        '''
+        get_forced_actions() -> (forced_actions : np.ndarray | None, value : int | None)
+
+        The moves which the player has to choose, and the proven result of the player if it is known.
+        1. player makes a five                   -> fives, win(1)
+        2. enemy makes two or more fives         -> fives of enemy, lose(-1) (only one can be blocked)
+        3. enemy makes a five                    -> the five of enemy to block, unknown(None)
+        4. player makes an open four             -> open fours, win(1)
+        Otherwise nothing is forced. -> (None, None)
+        '''
+        player_board, enemy_board = self._get_boards()
+        player_threats = find_threats(player_board, enemy_board, self.winning_condition, ('five', 'open_four'))
+        enemy_threats = find_threats(enemy_board, player_board, self.winning_condition, ('five',))
+
+        if len(player_threats['five']) > 0:
+            return player_threats['five'], 1
+
+        if len(enemy_threats['five']) > 1:
+            return enemy_threats['five'], -1
+
+        if len(enemy_threats['five']) == 1:
+            return enemy_threats['five'], None
+
+        if len(player_threats['open_four']) > 0:
+            return player_threats['open_four'], 1
+
+        return None, None
+
 
     def is_first_player(self):
-        return (np.sum(self.player_state) + np.sum(self.enemy_state)) % 2 == 0
+        return self.n_stones % 2 == 0
 
     def _render_board_to_str(self):
         
@@ -203,75 +231,259 @@ class BaseState(ABC):
 
     def __str__(self):
         return self._render_board_to_str()
-    
-    @abstractmethod
+
+    def _get_boards(self):
+        '''
+        _get_boards() -> (player_board, enemy_board) : board of any dtype to be copied by encode()
+        '''
+        return self.player_state, self.enemy_state
+
+    def encode(self, out):
+        '''
+        encode(out : np.ndarray (len(features), *state_shape)) -> out
+
+        This method writes the features of state into out, without allocating new planes.
+        out can be a float32 buffer or a slice of (pinned) torch tensor seen by tensor.numpy().
+        '''
+        player_board, enemy_board = self._get_boards()
+        is_first_player = float(self.is_first_player())
+
+        for plane, feature in zip(out, self.features):
+            if feature == 'player':
+                plane[...] = player_board
+            elif feature in ('enemy', 'prev_enemy'):
+                plane[...] = enemy_board
+            elif feature == 'action':
+                plane[...] = 0
+            elif feature == 'first':
+                plane[...] = is_first_player
+
+        if self.next_action is not None:
+            row, col = divmod(self.next_action, self.state_shape[1])
+            for plane, feature in zip(out, self.features):
+                if feature == 'action':
+                    plane[row, col] = 1
+                elif feature == 'prev_enemy':
+                    plane[row, col] = 0
+
+        return out
+
     def __call__(self):
+        '''
+        __call__() -> state : np.ndarray (len(features), *state_shape) float32
+        '''
+        return self.encode(np.empty((len(self.features), *self.state_shape), dtype=np.float32))
+
+    @property
+    @abstractmethod
+    def features(self):
+        '''
+        features : tuple[str]
+
+        planes of __call__(), each is one of 
+        'player' : player board
+        'enemy' : enemy board
+        'prev_enemy' : enemy board before next_action
+        'action' : next_action as one-hot
+        'first' : 1 is first player? else 0
+        '''
         pass
 
-def select_state(n_dim=1):
-    class BasicState(BaseState):
-        def __call__(self):
-            '''
-            (2, *STATE_SHAPE)
-            [0] : player board 
-            [1] : enemy board 
-            '''
-            return np.stack([self.player_state, self.enemy_state], axis=0)
-
-    class FirstMoveState(BaseState):
-        def __call__(self):
-            '''
-            (3, *STATE_SHAPE)
-            [0] : player board 
-            [1] : enemy board 
-            [2] : 1 is first player? else 0
-            '''
-            state = np.zeros(shape=(3,*STATE_SHAPE))
-            state[0] = self.player_state
-            state[1] = self.enemy_state
-            if self.is_first_player():
-                state[2] = 1
-            
-            return state 
+
+@lru_cache(maxsize=None)
+def get_bit_layout(state_shape):
+    '''
+    get_bit_layout(state_shape : tuple) -> action_to_bit : np.ndarray, full_mask : int, shifts : tuple
+
+    Every row of the board is stored with one blank bit on its right side.
+    So shifting a line by (1, ncol+1, ncol+2, ncol) bits never wraps it into the next row.
+    '''
+    nrow, ncol = state_shape
+    action_to_bit = np.arange(nrow * ncol).reshape(state_shape) + np.arange(nrow).reshape(-1, 1)
+    action_to_bit = action_to_bit.reshape(-1)
+
+    full_mask = 0
+    for bit in action_to_bit:
+        full_mask |= 1 << int(bit)
+
+    shifts = (1, ncol + 1, ncol + 2, ncol) # row, col, diag(↘), anti diag(↙)
+
+    return action_to_bit, full_mask, shifts
+
+@lru_cache(maxsize=None)
+def get_line_masks(state_shape, winning_condition):
+    '''
+    get_line_masks(state_shape : tuple, winning_condition : int) -> cell_masks : tuple[tuple[int]]
+
+    cell_masks[cell] is the bit masks of the winning lines through the cell.
+    The number of lines through a cell depends only on winning_condition, not on the board size.
+    '''
+    action_to_bit, _, _ = get_bit_layout(state_shape)
+    lines, cell_lines = get_winning_lines(state_shape, winning_condition)
+
+    line_masks = [sum(1 << int(action_to_bit[cell]) for cell in line) for line in lines]
+    return tuple(tuple(line_masks[idx] for idx in line_indices) for line_indices in cell_lines)
+
+
+class BitboardState(BaseState):
+    '''
+    Bitboard version of BaseState.
+    Each side is stored as a python int, so next() copies two ints instead of two boards.
+    player_state & enemy_state are still available as boards to keep __call__() and the notebooks unchanged.
+    '''
+    __slots__ = ('player_bits', 'enemy_bits', 'action_to_bit', 'full_mask', 'shifts')
+
+    def __init__(self, player_state=None, enemy_state=None, next_action=None, state_shape=None, winning_condition=None):
+        # state shape & bit layout
+        self.state_shape = self.default_state_shape if state_shape is None else tuple(state_shape)
+        self.action_to_bit, self.full_mask, self.shifts = get_bit_layout(self.state_shape)
+
+        # player, enemy's action
+        self.player_bits = self._to_bits(player_state)
+        self.enemy_bits = self._to_bits(enemy_state)
+        if next_action is not None:
+            self.enemy_bits |= 1 << int(self.action_to_bit[next_action])
+
+        self.next_action = next_action
+
+        # state info about action space
+        self.action_space = range(self.state_shape[0]*self.state_shape[1])
+        self.n_actions = len(self.action_space)
+
+        self.winning_condition = self.default_winning_condition if winning_condition is None else winning_condition
+
+        self.done_condition = [None] * 3 # win, draw, lose
+
+        self.n_stones = (self.player_bits | self.enemy_bits).bit_count()
+
+        self.legal_actions = None
+        self.action_slots = None
+
+        self.zobrist_keys = None
+
+    def _to_bits(self, board):
+        if board is None:
+            return 0
+
+        if isinstance(board, int):
+            return board
+
+        bits = 0
+        for action in np.flatnonzero(np.asarray(board).reshape(-1)):
+            bits |= 1 << int(self.action_to_bit[action])
+        return bits
+
+    def _unpack(self, bits):
+        n_bytes = (self.full_mask.bit_length() + 7) // 8
+        unpacked = np.unpackbits(np.frombuffer(bits.to_bytes(n_bytes, 'little'), dtype=np.uint8), bitorder='little')
+        return unpacked[self.action_to_bit]
+
+    def _to_board(self, bits):
+        return self._unpack(bits).reshape(self.state_shape).astype(np.float64)
+
+    def _get_boards(self):
+        return self._unpack(self.player_bits).reshape(self.state_shape), self._unpack(self.enemy_bits).reshape(self.state_shape)
+
+    @property
+    def player_state(self):
+        return self._to_board(self.player_bits)
+
+    @property
+    def enemy_state(self):
+        return self._to_board(self.enemy_bits)
+
+    def next(self, action : int):
+        state = self.__class__(self.enemy_bits, self.player_bits, next_action=action, 
+                               state_shape=self.state_shape, winning_condition=self.winning_condition)
+        self._link_next_state(state, action)
+        return state
+
+    def _find_legal_actions(self):
+        return np.flatnonzero(self._unpack(self.full_mask & ~(self.player_bits | self.enemy_bits)))
+
+    def _has_consecutive(self, bits):
+        '''
+        x & (x >> shift) keeps the stones whose next stone on the line also exists.
+        Repeating it (winning_condition - 1) times keeps only the start of a line of winning_condition.
+        '''
+        for shift in self.shifts:
+            line = bits
+            for _ in range(self.winning_condition - 1):
+                line &= line >> shift
+                if not line:
+                    break
+            if line:
+                return True
+        return False
+
+    def is_win(self):
+        if self.done_condition[0] is None:
+            self.done_condition[0] = self._has_consecutive(self.player_bits)
+        return self.done_condition[0]
+
+    def is_lose(self):
+        if self.done_condition[2] is None:
+            if self.next_action is None:
+                self.done_condition[2] = self._has_consecutive(self.enemy_bits)
+            else:
+                # only the lines through next_action can be completed by it.
+                line_masks = get_line_masks(self.state_shape, self.winning_condition)[self.next_action]
+                self.done_condition[2] = any(self.enemy_bits & mask == mask for mask in line_masks)
+        return self.done_condition[2]
+
+    def __deepcopy__(self, memo):
+        state = self.__class__(self.player_bits, self.enemy_bits, state_shape=self.state_shape, winning_condition=self.winning_condition)
+        state.next_action = self.next_action
+        state.done_condition = list(self.done_condition)
+        return state
+
+
+def select_state(n_dim=1, bitboard=USE_BITBOARD, state_shape=STATE_SHAPE, winning_condition=WINNING_CONDITION):
+    '''
+    select_state(n_dim : int, bitboard : bool, state_shape : tuple, winning_condition : int) -> State : class
+
+    bitboard=True builds the same state classes on top of BitboardState instead of BaseState.
+    State() starts a game of state_shape board & winning_condition. (e.g. (15, 15), 5 for Gomoku)
+    '''
+    base = BitboardState if bitboard else BaseState
+
+    class BasicState(base):
+        '''
+        (2, *state_shape)
+        [0] : player board 
+        [1] : enemy board 
+        '''
+        features = ('player', 'enemy')
+
+    class FirstMoveState(base):
+        '''
+        (3, *state_shape)
+        [0] : player board 
+        [1] : enemy board 
+        [2] : 1 is first player? else 0
+        '''
+        features = ('player', 'enemy', 'first')
         
-    class ActionAwareState(BaseState):
-        def __call__(self):
-            '''
-            (4, *STATE_SHAPE)
-            [0] : player board 
-            [1] : enemy board 
-            [2] : previous enemy's action as one-hot 
-            [3] : 1 is first player? else 0
-            '''
-            state = np.zeros(shape=(4, *STATE_SHAPE))
-            state[0] = self.player_state
-            state[1] = self.enemy_state
-            if self.next_action is not None:
-                row, col = divmod(self.next_action, STATE_SHAPE[1])
-                state[2, row, col] = 1
-            if self.is_first_player():
-                state[3] = 1
-            return state
+    class ActionAwareState(base):
+        '''
+        (4, *state_shape)
+        [0] : player board 
+        [1] : enemy board 
+        [2] : previous enemy's action as one-hot 
+        [3] : 1 is first player? else 0
+        '''
+        features = ('player', 'enemy', 'action', 'first')
         
-    class WithPreviousState(BaseState):
-        def __call__(self):
-            '''
-            (5, *STATE_SHAPE)
-            [0] : player board 
-            [1] : enemy board 
-            [2] : player board before 1 step (fixed)
-            [3] : enemy board before 1 step (changed by action)
-            [4] : 1 is first player? else 0
-            '''
-            state = np.zeros(shape=(5, *self.state_shape))
-            state[(0, 2), :] = self.player_state
-            state[(1, 3), :] = self.enemy_state
-            if self.next_action is not None:
-                row, col = divmod(self.next_action, self.state_shape[1])
-                state[3, row, col] = 0
-            if self.is_first_player():
-                state[4] = 1
-            return state
+    class WithPreviousState(base):
+        '''
+        (5, *state_shape)
+        [0] : player board 
+        [1] : enemy board 
+        [2] : player board before 1 step (fixed)
+        [3] : enemy board before 1 step (changed by action)
+        [4] : 1 is first player? else 0
+        '''
+        features = ('player', 'enemy', 'player', 'prev_enemy', 'first')
         
     state_classes = {
         2 : BasicState,
@@ -282,5 +494,44 @@ def select_state(n_dim=1):
     
     if n_dim not in state_classes:
         raise ValueError(f"Invalid state dimension: {n_dim}. Choose from {list(state_classes.keys())}")
+
+    State = state_classes[n_dim]
+    State.default_state_shape = tuple(state_shape)
+    State.default_winning_condition = winning_condition
     
-    return state_classes[n_dim]
\ No newline at end of file
+    return State
+
+def encode_states(states, out=None):
+    '''
+    encode_states(states : list[State], out : np.ndarray) -> out : np.ndarray (len(states), len(features), *state_shape) float32
+
+    This method encodes a batch of states (same class) into one contiguous array.
+    Each feature is written for the whole batch at once.
+    out can be a preallocated buffer whose first dim is larger than len(states).
+    '''
+    n_batch, features, state_shape = len(states), states[0].features, states[0].state_shape
+
+    if out is None:
+        out = np.empty((n_batch, len(features), *state_shape), dtype=np.float32)
+    out = out[:n_batch]
+
+    boards = [state._get_boards() for state in states]
+    is_first_player = np.array([state.is_first_player() for state in states], dtype=np.float32)
+
+    with_action = [idx for idx, state in enumerate(states) if state.next_action is not None]
+    rows, cols = np.divmod(np.array([states[idx].next_action for idx in with_action], dtype=np.int64), state_shape[1])
+
+    for channel, feature in enumerate(features):
+        if feature == 'player':
+            np.stack([board[0] for board in boards], axis=0, out=out[:, channel])
+        elif feature in ('enemy', 'prev_enemy'):
+            np.stack([board[1] for board in boards], axis=0, out=out[:, channel])
+            if feature == 'prev_enemy':
+                out[with_action, channel, rows, cols] = 0
+        elif feature == 'action':
+            out[:, channel] = 0
+            out[with_action, channel, rows, cols] = 1
+        elif feature == 'first':
+            out[:, channel] = is_first_player[:, None, None]
+
+    return out
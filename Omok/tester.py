@@ -14,7 +14,7 @@ class ModelvsHuman:
     '''
     def __init__(self, model):
         self.model = model
-        self.mcts = MCTS(N_PLAYOUT)
+        self.mcts = MCTS(N_PLAYOUT, time_limit=MOVE_TIME_LIMIT)
         self.get_next_actions = self.mcts.get_legal_actions_of(model, 0, with_policy=True)
 
     def vs_human(self, with_policy=True):
@@ -25,19 +25,19 @@ class ModelvsHuman:
             > print : (state, policy, n_visit) visualization
             > print : (state, _, _) visualization
         '''
-        def flatten_idx(coord):
-            return coord[0] * STATE_SHAPE[1] + coord[1]
-        
         state = State()
 
+        def flatten_idx(coord):
+            return coord[0] * state.state_shape[1] + coord[1]
+
         while True:
             if state.is_done():
                 break
 
             # MCTS actions 
             action, policy, n_visits = self.get_next_actions(state)
-            x, y = divmod(action, STATE_SHAPE[1])
-            print(f"Alpha Zero's Action is : {(int(x), int(y))}")
+            x, y = divmod(action, state.state_shape[1])
+            print(f"Alpha Zero's Action is : {(int(x), int(y))} ({self.mcts.n_playouts_done} playouts)")
 
             if  with_policy:
                 visualize_pack('best', state(), n_visits, policy, action)
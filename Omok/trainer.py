@@ -8,6 +8,7 @@ import random
 
 from utils.setDevice import *
 from config import *
+from Omok.evalCache import *
 
 class TrainNetwork:
     '''
@@ -41,7 +42,7 @@ class TrainNetwork:
         sample = random.sample(history, self.batch_size)
         states, target_policies, target_values = zip(*sample)
 
-        states = torch.tensor(np.array(states), dtype=torch.float32, device=device).view(self.batch_size, -1, *STATE_SHAPE)  # (BATCH, STATE_DIM, *STATE_SHAPE)
+        states = torch.tensor(np.array(states), dtype=torch.float32, device=device)  # (BATCH, STATE_DIM, *state_shape)
         target_policies = torch.tensor(np.array(target_policies), dtype=torch.float32, device=device).view(self.batch_size, -1)  # (BATCH, N_ACTIONS)
         target_values = torch.tensor(np.array(target_values), dtype=torch.float32, device=device).view(self.batch_size, -1)  # (BATCH, 1)
 
@@ -54,9 +55,10 @@ class TrainNetwork:
         # p_loss = self.cross_entropy_loss(raw_policy, target_policies)
         # p_loss = F.kl_div(raw_policy.log(), target_policies, reduction='batchmean')
 
-        # cross entropy 
+        # cross entropy (zero policies : fast searches of the playout cap, no policy target)
         log_p = torch.log(raw_policy)
-        p_loss = -torch.mean(torch.sum(target_policies * log_p, 1))
+        has_policy = target_policies.sum(1) > 0
+        p_loss = -torch.sum(target_policies * log_p) / has_policy.sum().clamp(min=1)
 
         # mse loss 
         v_loss = F.mse_loss(value, target_values)
@@ -84,6 +86,9 @@ class TrainNetwork:
 
         print("> Train Ended.")
         self.scheduler.step()
+
+        # weights are changed in place by the optimizer, so the cached nn outputs are stale
+        nn_cache.invalidate(self.model)
         
 
     def update_model(self, model):
@@ -0,0 +1,98 @@
+import sys
+import os
+from collections import OrderedDict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import *
+
+class TranspositionTable:
+    '''
+    TranspositionTable(max_mb : float)
+
+    The TranspositionTable class maps the zobrist key of a position to an expanded node of MCTS and its nn value.
+    The same stones reached by another move order take the child nodes of the stored node,
+    so both paths share the statistics of the subtree & the nn evaluation. (the tree becomes a DAG)
+    Positions are evicted in least recently used order when their child nodes take more than max_mb.
+    Evicted nodes stay in the tree, only new transpositions to them are not found anymore.
+
+    : main method :
+    lookup(state) -> (node, value) | None
+    store(state, node, value) -> None
+    get_stats() -> dict
+    '''
+    def __init__(self, max_mb=TRANSPOSITION_MB):
+        self.max_nbytes = int(max_mb * 2**20)
+        self.nbytes = 0
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.n_evicted = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, state):
+        '''
+        lookup(state : class) -> (node : Node, value : float) | None
+        '''
+        key = state.get_zobrist_key()
+        entry = self.entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def store(self, state, node, value):
+        '''
+        store(state : class, node : Node, value : float) -> None
+
+        node must be expanded by the nn, and value is the nn value of state.
+        '''
+        key = state.get_zobrist_key()
+        if key in self.entries:
+            self.nbytes -= self._get_nbytes(self.entries[key][0])
+
+        self.entries[key] = (node, value)
+        self.entries.move_to_end(key)
+        self.nbytes += self._get_nbytes(node)
+
+        while self.nbytes > self.max_nbytes and len(self.entries) > 0:
+            _, (old_node, _) = self.entries.popitem(last=False)
+            self.nbytes -= self._get_nbytes(old_node)
+            self.n_evicted += 1
+
+    def _get_nbytes(self, node):
+        '''
+        _get_nbytes(node : Node) -> nbytes : int
+
+        Approximate memory of the node's children. (child nodes, child_stats arrays, table entry)
+        '''
+        nbytes = sys.getsizeof(node.child_nodes) + sum(sys.getsizeof(child_node) for child_node in node.child_nodes)
+        nbytes += sum(sys.getsizeof(stats) for stats in node.child_stats)
+
+        return nbytes + sys.getsizeof((node, 0.0))
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def get_stats(self):
+        '''
+        get_stats() -> stats : dict (size, hits, misses, hit_rate, evicted, nbytes)
+        '''
+        n_lookups = self.hits + self.misses
+
+        return {
+            'size' : len(self.entries),
+            'hits' : self.hits,
+            'misses' : self.misses,
+            'hit_rate' : self.hits / n_lookups if n_lookups else 0.0,
+            'evicted' : self.n_evicted,
+            'nbytes' : self.nbytes,
+        }
@@ -0,0 +1,65 @@
+import sys
+import os
+import numpy as np
+from functools import lru_cache
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import *
+from utils.transpose_state import *
+
+ZOBRIST_SEED = 2024
+
+@lru_cache(maxsize=None)
+def get_symmetry_cells(state_shape=STATE_SHAPE):
+    '''
+    get_symmetry_cells(state_shape : tuple) -> symmetry_cells : np.ndarray (n_symmetry, n_cells)
+
+    symmetry_cells[idx, cell] is where the cell moves by get_dihedral_transpose_ftns(idx).
+    Square boards have 8 symmetries, the others keep only the 4 which do not change the shape.
+    '''
+    cells = np.arange(state_shape[0] * state_shape[1]).reshape(1, *state_shape)
+
+    symmetry_cells = []
+    for idx in get_symmetry_idxs(state_shape):
+        rotate_ftn, _ = get_dihedral_transpose_ftns(idx)
+        moved_cells = rotate_ftn(cells)
+
+        # moved_cells[new_cell] = cell -> inverse it
+        new_cells = np.empty(cells.size, dtype=np.int64)
+        new_cells[moved_cells.reshape(-1)] = np.arange(cells.size)
+        symmetry_cells.append(new_cells)
+
+    symmetry_cells = np.stack(symmetry_cells, axis=0)
+    symmetry_cells.flags.writeable = False
+    return symmetry_cells
+
+@lru_cache(maxsize=None)
+def get_zobrist_table(state_shape=STATE_SHAPE, seed=ZOBRIST_SEED):
+    '''
+    get_zobrist_table(state_shape : tuple, seed : int) -> table : np.ndarray (2, n_symmetry, n_cells)
+
+    table[color, idx, cell] is the random 64-bit key of a stone(color 0 : first player, 1 : second player),
+    already moved by the symmetry idx. XOR of them over the stones is the key of the board seen through idx.
+    '''
+    rng = np.random.default_rng(seed)
+    keys = rng.integers(0, 2**64, size=(2, state_shape[0] * state_shape[1]), dtype=np.uint64)
+
+    table = keys[:, get_symmetry_cells(state_shape)]
+    table.flags.writeable = False
+    return table
+
+def compute_zobrist_keys(first_board, second_board, state_shape=STATE_SHAPE):
+    '''
+    compute_zobrist_keys(first_board : np.ndarray, second_board : np.ndarray, state_shape : tuple) -> keys : np.ndarray (n_symmetry,)
+
+    This method computes the keys from scratch. (next() updates them incrementally instead)
+    '''
+    table = get_zobrist_table(state_shape)
+    keys = np.zeros(table.shape[1], dtype=np.uint64)
+
+    for color, board in enumerate((first_board, second_board)):
+        cells = np.flatnonzero(np.asarray(board).reshape(-1))
+        keys ^= np.bitwise_xor.reduce(table[color][:, cells], axis=1)
+
+    return keys
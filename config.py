@@ -28,10 +28,13 @@ ALLOW_TRANSPOSE ensures that the state-policy remains invariant under transposit
 maintaining symmetry invariance when MCTS expands.
 
 DATA_AGUMENTATION expands the single self play into 8 various form to maintain symmetry invariance.
+
+USE_BITBOARD stores each side of the state as bits instead of a board. (faster next(), is_done())
 '''
 STATE_DIM = 4 # (2,3,4,5)
 ALLOW_TRANSPOSE = False 
 DATA_AGUMENTATION = True 
+USE_BITBOARD = False 
 
 # count #
 '''
@@ -40,6 +43,21 @@ params of size-count.
 TOTAL_SELFPLAY = 2000
 EVAL_SELFPLAY = 20  
 N_PLAYOUT = 400
+N_LEAF_BATCH = 1 # leaves evaluated by a single nn call in MCTS (1 : sequential search, > 1 : virtual loss changes the visits)
+REUSE_TREE = False # MCTS keeps the subtree of the played moves for the next search (the web server keeps it for pondering)
+COUNT_REUSED_VISITS = False # reused visits of the root count toward N_PLAYOUT (True : less time per move)
+USE_TRANSPOSITION = False # MCTS shares the subtree of the same stones reached by another move order
+TRANSPOSITION_MB = 256 # memory cap of the transposition table of each model (least recently used evicted)
+USE_NN_CACHE = False # nn outputs are cached by canonical position, shared by every MCTS
+NN_CACHE_MB = 256 # memory cap of the nn cache (least recently used evicted)
+MOVE_TIME_LIMIT = 3.0 # (None or sec) search time per move of the web server & ModelvsHuman, up to N_PLAYOUT playouts
+EARLY_STOP = True # greedy search (temp == 0) stops when the best action cannot be overtaken (same move & one-hot target)
+STOP_CONFIDENCE = None # (None or float) greedy search also stops when the best action has this share of the visits
+N_SEARCH_THREADS = 4 # search threads of ParallelMCTS sharing one tree (web server, EvalNetwork with PARALLEL_EVAL)
+PARALLEL_EVAL = False # EvalNetwork searches by ParallelMCTS (faster, but thread scheduling makes the eval games nondeterministic)
+N_SEARCH_WORKERS = 4 # processes of RootParallelMCTS, each searching its own tree (visits merged at the root)
+USE_PONDERING = True # web server searches on the human's time, and its next search only runs the playouts left of N_PLAYOUT
+PONDER_PLAYOUTS = 4000 # max playouts of pondering per human move
 TRAIN_EPOCHS = 100
 MEM_SIZE = 30000
 
@@ -64,6 +82,13 @@ EVAL_TEMPERATURE = 0
 # selfplay : exploration #
 C_PUCT = 5.0
 EXPLORE_REGULATION = 10 # (None or int) 
+USE_THREAT_DETECTION = False # MCTS searches only forced moves (five, block, open four), changes the self-play targets
+USE_SOLVER = False # MCTS proves nodes by terminal & forced results, skips proven-losing moves and stops at a proven root
+PLAYOUT_CAP_RANDOMIZATION = False # self-play searches most moves by N_FAST_PLAYOUT playouts, which are not policy targets
+FULL_SEARCH_PROB = 0.25 # share of self-play moves searched by N_PLAYOUT playouts (policy targets)
+N_FAST_PLAYOUT = 64 # playouts of the other self-play moves
+USE_GUMBEL = False # self-play searches by GumbelMCTS (sequential halving at the root), strong with 16 ~ 64 playouts, so N_PLAYOUT can be lowered
+GUMBEL_N_SAMPLED = 16 # actions sampled at the root by gumbel-top-k
 
 # frequency # 
 TRAIN_FREQUENCY = 1
@@ -87,11 +112,27 @@ WINNING_CONDITION = {WINNING_CONDITION}
 STATE_DIM = {STATE_DIM}
 ALLOW_TRANSPOSE = {ALLOW_TRANSPOSE} 
 DATA_AGUMENTATION = {DATA_AGUMENTATION} 
+USE_BITBOARD = {USE_BITBOARD} 
 
 # count #
 TOTAL_SELFPLAY = {TOTAL_SELFPLAY}
 EVAL_SELFPLAY = {EVAL_SELFPLAY}  
 N_PLAYOUT = {N_PLAYOUT} 
+N_LEAF_BATCH = {N_LEAF_BATCH}
+REUSE_TREE = {REUSE_TREE}
+COUNT_REUSED_VISITS = {COUNT_REUSED_VISITS}
+USE_TRANSPOSITION = {USE_TRANSPOSITION}
+TRANSPOSITION_MB = {TRANSPOSITION_MB}
+USE_NN_CACHE = {USE_NN_CACHE}
+NN_CACHE_MB = {NN_CACHE_MB}
+MOVE_TIME_LIMIT = {MOVE_TIME_LIMIT}
+EARLY_STOP = {EARLY_STOP}
+STOP_CONFIDENCE = {STOP_CONFIDENCE}
+N_SEARCH_THREADS = {N_SEARCH_THREADS}
+PARALLEL_EVAL = {PARALLEL_EVAL}
+N_SEARCH_WORKERS = {N_SEARCH_WORKERS}
+USE_PONDERING = {USE_PONDERING}
+PONDER_PLAYOUTS = {PONDER_PLAYOUTS}
 TRAIN_EPOCHS = {TRAIN_EPOCHS}
 MEM_SIZE = {MEM_SIZE}
 
@@ -113,6 +154,13 @@ EVAL_TEMPERATURE = {EVAL_TEMPERATURE}
 # selfplay : exploration #
 C_PUCT = {C_PUCT}
 EXPLORE_REGULATION = {EXPLORE_REGULATION}
+USE_THREAT_DETECTION = {USE_THREAT_DETECTION}
+USE_SOLVER = {USE_SOLVER}
+PLAYOUT_CAP_RANDOMIZATION = {PLAYOUT_CAP_RANDOMIZATION}
+FULL_SEARCH_PROB = {FULL_SEARCH_PROB}
+N_FAST_PLAYOUT = {N_FAST_PLAYOUT}
+USE_GUMBEL = {USE_GUMBEL}
+GUMBEL_N_SAMPLED = {GUMBEL_N_SAMPLED}
 
 # frequency # 
 TRAIN_FREQUENCY = {TRAIN_FREQUENCY}
@@ -120,4 +168,4 @@ EVAL_FREQUENCY = {EVAL_FREQUENCY}
 VISUALIZATION_FREQUENCY = {VISUALIZATION_FREQUENCY}
 LEARN_FREQUENCY = {LEARN_FREQUENCY}
 
-'''
\ No newline at end of file
+'''
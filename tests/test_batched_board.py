@@ -0,0 +1,67 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Omok.state import *
+from Omok.batchedBoard import *
+
+def get_winner(state):
+    '''
+    winner of BatchedBoard for a state : 0 (first player), 1 (second player), -1 (draw or not ended)
+    '''
+    if not state.is_lose():
+        return -1
+    return 1 if state.is_first_player() else 0
+
+@pytest.mark.parametrize("state_shape, winning_condition", [((9, 9), 5), ((6, 7), 4), ((3, 3), 3)])
+@pytest.mark.parametrize("n_dim", [2, 5])
+def test_batched_board_matches_base_state(n_dim, state_shape, winning_condition):
+    n_games = 64
+    State = select_state(n_dim, False, state_shape, winning_condition)
+    rng = np.random.default_rng(0)
+
+    board = BatchedBoard(n_games, state_shape, winning_condition)
+    states = [State() for _ in range(n_games)]
+
+    while True:
+        legal_mask, terminal, winner = board.legal_mask(), board.terminal(), board.winner()
+
+        for idx, state in enumerate(states):
+            assert terminal[idx] == state.is_done()
+            assert winner[idx] == get_winner(state)
+
+            if state.is_done():
+                assert not legal_mask[idx].any()
+                continue
+
+            assert np.array_equal(np.flatnonzero(legal_mask[idx]), state.get_legal_actions())
+
+            batched_state = board.get_state(idx, State)
+            assert np.array_equal(batched_state(), state())
+            assert np.array_equal(batched_state.get_legal_actions(), state.get_legal_actions())
+            assert batched_state.is_done() == state.is_done()
+
+        if terminal.all():
+            break
+
+        actions = np.zeros(n_games, dtype=np.int64)
+        for idx, state in enumerate(states):
+            if not state.is_done():
+                actions[idx] = rng.choice(state.get_legal_actions())
+                states[idx] = state.next(int(actions[idx]))
+
+        board.step(actions)
+
+    # both endings are covered on the small board
+    if state_shape == (3, 3):
+        assert (board.winner() >= 0).any() and (board.winner() == -1).any()
+
+def test_illegal_action():
+    board = BatchedBoard(2, (9, 9), 5)
+    board.step([0, 1])
+
+    with pytest.raises(ValueError):
+        board.step([0, 2])
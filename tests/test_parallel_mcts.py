@@ -0,0 +1,40 @@
+import sys
+import os
+import random
+import torch
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import *
+from Omok.state import *
+from Omok.parallelMCTS import *
+from network.resnet import *
+
+@pytest.mark.parametrize("kwargs", [dict(reuse_tree=True, count_reused=True), dict(use_transposition=True)])
+def test_root_parallel_searches_are_independent(kwargs):
+    torch.manual_seed(0)
+    model = Network(1, 8, STATE_DIM, N_ACTIONS)
+    State = select_state(STATE_DIM)
+
+    n_workers, n_playout = 2, 30
+    mcts = RootParallelMCTS(n_playout, n_workers, use_threats=False, use_nn_cache=False, **kwargs)
+
+    state = State().next(40)
+    rng = random.Random(0)
+
+    try:
+        # same position, then the following positions (a kept tree would add its visits)
+        for _ in range(4):
+            childs_n = mcts._search(state, model)
+
+            # the first playout of each worker evaluates its root, the others visit a child
+            assert sum(childs_n) == n_workers * (n_playout - 1)
+            assert mcts.n_playouts_done == n_workers * n_playout
+
+            childs_n = mcts._search(state, model)
+            assert sum(childs_n) == n_workers * (n_playout - 1)
+
+            state = state.next(rng.choice(list(state.get_legal_actions())))
+    finally:
+        mcts.close()
@@ -0,0 +1,52 @@
+import sys
+import os
+import random
+import threading
+import numpy as np
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import *
+from Omok.state import *
+from Omok.MCTS import *
+from network.resnet import *
+
+def test_concurrent_forward_batch():
+    torch.manual_seed(0)
+    model = Network(1, 8, STATE_DIM, N_ACTIONS)
+    model.eval()
+    State = select_state(STATE_DIM)
+
+    rng = random.Random(0)
+    state_lists = []
+    for _ in range(4):
+        state, states = State(), []
+        for _ in range(8):
+            state = state.next(rng.choice(list(state.get_legal_actions())))
+            states.append(state)
+        state_lists.append(states)
+
+    expected = [forward_batch(model, states) for states in state_lists]
+    results, errors = {}, []
+
+    def run(idx):
+        try:
+            for _ in range(50):
+                raw_policies, values = forward_batch(model, state_lists[idx])
+                if not (np.allclose(raw_policies, expected[idx][0], atol=1e-6) and np.allclose(values, expected[idx][1], atol=1e-6)):
+                    results[idx] = False
+                    return
+            results[idx] = True
+        except Exception as e:
+            errors.append(e)
+
+    # same batch shape in every thread
+    threads = [threading.Thread(target=run, args=(idx,)) for idx in range(len(state_lists))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert all(results[idx] for idx in range(len(state_lists)))
@@ -0,0 +1,68 @@
+import sys
+import os
+import random
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Omok.state import *
+
+def play_lockstep(n_dim, state_shape, winning_condition, seed):
+    '''
+    play_lockstep(n_dim : int, state_shape : tuple, winning_condition : int, seed : int) -> (base_state, bitboard_state) of every ply
+
+    This method plays a seeded random game through BaseState & BitboardState by the same actions.
+    '''
+    BaseState_ = select_state(n_dim, False, state_shape, winning_condition)
+    BitboardState_ = select_state(n_dim, True, state_shape, winning_condition)
+    rng = random.Random(seed)
+
+    base_state, bitboard_state = BaseState_(), BitboardState_()
+    yield base_state, bitboard_state
+
+    while not base_state.is_done():
+        action = rng.choice(list(base_state.get_legal_actions()))
+        base_state, bitboard_state = base_state.next(action), bitboard_state.next(action)
+        yield base_state, bitboard_state
+
+@pytest.mark.parametrize("state_shape, winning_condition", [((9, 9), 5), ((15, 15), 5), ((6, 7), 4)])
+@pytest.mark.parametrize("n_dim", [2, 3, 4, 5])
+def test_bitboard_state_matches_base_state(n_dim, state_shape, winning_condition):
+    for seed in range(10):
+        for base_state, bitboard_state in play_lockstep(n_dim, state_shape, winning_condition, seed):
+            assert bitboard_state.is_done() == base_state.is_done()
+            assert bitboard_state.is_lose() == base_state.is_lose()
+            assert bitboard_state.is_draw() == base_state.is_draw()
+            assert bitboard_state.is_first_player() == base_state.is_first_player()
+            assert np.array_equal(bitboard_state.get_legal_actions(), base_state.get_legal_actions())
+            assert np.array_equal(bitboard_state(), base_state())
+
+def test_bitboard_state_ends_like_base_state():
+    n_lose, n_draw = 0, 0
+
+    for seed in range(200):
+        *_, (base_state, bitboard_state) = play_lockstep(2, (3, 3), 3, seed)
+        assert bitboard_state.is_lose() == base_state.is_lose()
+        assert bitboard_state.is_draw() == base_state.is_draw()
+
+        n_lose += base_state.is_lose()
+        n_draw += base_state.is_draw()
+
+    # both endings are covered
+    assert n_lose > 0 and n_draw > 0
+
+@pytest.mark.parametrize("state_shape, winning_condition", [((9, 9), 5), ((6, 7), 4)])
+@pytest.mark.parametrize("n_dim", [2, 3, 4, 5])
+def test_encode_states_matches_state(n_dim, state_shape, winning_condition):
+    for seed in range(3):
+        base_states, bitboard_states = zip(*play_lockstep(n_dim, state_shape, winning_condition, seed))
+
+        for states in (base_states, bitboard_states):
+            expected = np.stack([state() for state in states])
+            assert np.array_equal(encode_states(states), expected)
+
+            # into a larger reused buffer, as forward_batch() does
+            out = np.full((len(states) + 3, n_dim, *state_shape), np.nan, dtype=np.float32)
+            encode_states(states, out)
+            assert np.array_equal(out[:len(states)], expected)
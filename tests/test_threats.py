@@ -0,0 +1,194 @@
+import sys
+import os
+import random
+import itertools
+from functools import lru_cache
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Omok.state import *
+from Omok.lines import *
+
+@lru_cache(maxsize=None)
+def get_windows(state_shape, winning_condition):
+    '''
+    get_windows(state_shape : tuple, winning_condition : int) -> windows : list[tuple]
+
+    every winning_condition cells in a row (flat index), by walking each cell & direction.
+    '''
+    nrow, ncol = state_shape
+    windows = []
+
+    for row, col in itertools.product(range(nrow), range(ncol)):
+        for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            cells = [(row + d_row * i, col + d_col * i) for i in range(winning_condition)]
+            if all(0 <= r < nrow and 0 <= c < ncol for r, c in cells):
+                windows.append(tuple(r * ncol + c for r, c in cells))
+
+    return windows
+
+def brute_threats(board, other_board, winning_condition):
+    '''
+    brute_threats(board : np.ndarray, other_board : np.ndarray, winning_condition : int) -> threats : dict[str, set]
+
+    find_threats() by sets over the windows without the opponent's stone.
+    '''
+    stones, others = board.reshape(-1) != 0, other_board.reshape(-1) != 0
+    free_windows = [window for window in get_windows(board.shape, winning_condition) if not any(others[cell] for cell in window)]
+    empties = [frozenset(cell for cell in window if not stones[cell]) for window in free_windows]
+
+    next_fives, next_open_fours = {}, {}
+    for empty in empties:
+        if len(empty) == 2:
+            for cell in empty:
+                next_fives.setdefault(cell, set()).update(empty - {cell})
+
+        if len(empty) == 3:
+            for cell, next_cell in itertools.permutations(empty, 2):
+                next_open_fours.setdefault((cell, next_cell), set()).update(empty - {cell, next_cell})
+
+    return {
+        'five' : {cell for empty in empties if len(empty) == 1 for cell in empty},
+        'four' : {cell for empty in empties if len(empty) == 2 for cell in empty},
+        'open_four' : {cell for cell, fives in next_fives.items() if len(fives) >= 2},
+        'open_three' : {cell for (cell, _), fives in next_open_fours.items() if len(fives) >= 2},
+    }
+
+def brute_forced_actions(state):
+    '''
+    brute_forced_actions(state : class) -> (forced_actions : set | None, value : int | None) by the rules of get_forced_actions()
+    '''
+    player_board, enemy_board = (np.asarray(board).reshape(state.state_shape) for board in state._get_boards())
+    player_threats = brute_threats(player_board, enemy_board, state.winning_condition)
+    enemy_threats = brute_threats(enemy_board, player_board, state.winning_condition)
+
+    if player_threats['five']:
+        return player_threats['five'], 1
+    if len(enemy_threats['five']) > 1:
+        return enemy_threats['five'], -1
+    if enemy_threats['five']:
+        return enemy_threats['five'], None
+    if player_threats['open_four']:
+        return player_threats['open_four'], 1
+    return None, None
+
+def assert_threats_match(board, other_board, winning_condition):
+    threats = find_threats(board, other_board, winning_condition)
+    expected = brute_threats(board, other_board, winning_condition)
+
+    for kind in THREAT_KINDS:
+        assert threats[kind].tolist() == sorted(expected[kind]), kind
+
+def test_find_threats_exhaustive_small_board():
+    # every board of 3x3 (each cell empty, player or opponent) with 3 in a row
+    for cells in itertools.product((0, 1, 2), repeat=9):
+        cells = np.array(cells).reshape(3, 3)
+        assert_threats_match(cells == 1, cells == 2, 3)
+
+@pytest.mark.parametrize("state_shape, winning_condition", [((6, 7), 4), ((7, 7), 5), ((9, 9), 5)])
+def test_find_threats_random_boards(state_shape, winning_condition):
+    rng = np.random.default_rng(0)
+
+    for _ in range(300):
+        density = rng.uniform(0.1, 0.6)
+        cells = rng.choice(3, size=state_shape, p=[1 - density, density / 2, density / 2])
+        assert_threats_match(cells == 1, cells == 2, winning_condition)
+
+@pytest.mark.parametrize("bitboard", [False, True])
+def test_forced_actions_random_games(bitboard):
+    State = select_state(2, bitboard, (9, 9), 5)
+    rng = random.Random(0)
+
+    for _ in range(10):
+        state = State()
+        while not state.is_done():
+            forced_actions, value = state.get_forced_actions()
+            expected_actions, expected_value = brute_forced_actions(state)
+
+            assert value == expected_value
+            if expected_actions is None:
+                assert forced_actions is None
+            else:
+                assert forced_actions.tolist() == sorted(expected_actions)
+
+            state = state.next(rng.choice(list(state.get_legal_actions())))
+
+def make_state(bitboard, player_stones, enemy_stones=()):
+    '''
+    make_state(bitboard : bool, player_stones : list[(row, col)], enemy_stones : list[(row, col)]) -> state of 15x15, 5 in a row
+    '''
+    player_board, enemy_board = np.zeros((15, 15)), np.zeros((15, 15))
+    for row, col in player_stones:
+        player_board[row, col] = 1
+    for row, col in enemy_stones:
+        enemy_board[row, col] = 1
+
+    return select_state(2, bitboard, (15, 15), 5)(player_board, enemy_board)
+
+def to_cells(*stones):
+    return [row * 15 + col for row, col in sorted(stones)]
+
+@pytest.mark.parametrize("bitboard", [False, True])
+def test_own_five(bitboard):
+    # our five comes before the enemy's five
+    state = make_state(bitboard, [(7, 3), (7, 4), (7, 5), (7, 6)], [(3, 3), (3, 4), (3, 5), (3, 6)])
+    forced_actions, value = state.get_forced_actions()
+
+    assert forced_actions.tolist() == to_cells((7, 2), (7, 7))
+    assert value == 1
+
+@pytest.mark.parametrize("bitboard", [False, True])
+def test_double_enemy_five_is_lost(bitboard):
+    state = make_state(bitboard, [(0, 0)], [(7, 3), (7, 4), (7, 5), (7, 6)])
+    forced_actions, value = state.get_forced_actions()
+
+    assert forced_actions.tolist() == to_cells((7, 2), (7, 7))
+    assert value == -1
+
+@pytest.mark.parametrize("bitboard", [False, True])
+def test_single_enemy_five_is_blocked(bitboard):
+    # the block comes before our open four
+    state = make_state(bitboard, [(3, 5), (3, 6), (3, 7)], [(7, 0), (7, 1), (7, 2), (7, 3)])
+    forced_actions, value = state.get_forced_actions()
+
+    assert forced_actions.tolist() == to_cells((7, 4))
+    assert value is None
+
+@pytest.mark.parametrize("bitboard", [False, True])
+def test_open_four(bitboard):
+    state = make_state(bitboard, [(7, 5), (7, 6), (7, 7)])
+    forced_actions, value = state.get_forced_actions()
+
+    assert forced_actions.tolist() == to_cells((7, 4), (7, 8))
+    assert value == 1
+
+@pytest.mark.parametrize("bitboard", [False, True])
+def test_four_four_fork(bitboard):
+    # two fours blocked on one side, crossing at (7, 4) : each can be blocked alone, not both
+    state = make_state(bitboard, [(7, 1), (7, 2), (7, 3), (4, 4), (5, 4), (6, 4)], [(7, 0), (3, 4)])
+    player_threats, _ = state.get_threats()
+    forced_actions, value = state.get_forced_actions()
+
+    assert to_cells((7, 4))[0] in player_threats['four']
+    assert forced_actions.tolist() == to_cells((7, 4))
+    assert value == 1
+
+@pytest.mark.parametrize("bitboard", [False, True])
+def test_four_against_edge_is_not_open(bitboard):
+    state = make_state(bitboard, [(7, 0), (7, 1), (7, 2)])
+    player_threats, _ = state.get_threats()
+
+    assert to_cells((7, 3))[0] in player_threats['four']
+    assert len(player_threats['open_four']) == 0
+    assert state.get_forced_actions() == (None, None)
+
+@pytest.mark.parametrize("bitboard", [False, True])
+def test_open_three(bitboard):
+    player_threats, _ = make_state(bitboard, [(7, 6), (7, 7)]).get_threats()
+    assert set(to_cells((7, 4), (7, 5), (7, 8), (7, 9))) <= set(player_threats['open_three'].tolist())
+
+    # blocked on one side : (7, 8) makes a four with a single five
+    player_threats, _ = make_state(bitboard, [(7, 6), (7, 7)], [(7, 5)]).get_threats()
+    assert to_cells((7, 8))[0] not in player_threats['open_three']
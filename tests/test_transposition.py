@@ -0,0 +1,70 @@
+import sys
+import os
+import random
+import torch
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import *
+from Omok.state import *
+from Omok.MCTS import *
+from Omok.parallelMCTS import *
+from Omok.gumbelMCTS import *
+from network.resnet import *
+
+def get_model():
+    torch.manual_seed(0)
+    return Network(1, 8, STATE_DIM, N_ACTIONS)
+
+def get_states(n_states, seed=0):
+    State = select_state(STATE_DIM)
+    state = State().next(40)
+    rng = random.Random(seed)
+
+    states = []
+    for _ in range(n_states):
+        states.append(state)
+        state = state.next(rng.choice(list(state.get_legal_actions())))
+
+    return states
+
+@pytest.mark.parametrize("MCTSClass, kwargs", [(MCTS, dict()),
+                                               (MCTS, dict(n_batch=8)),
+                                               (ParallelMCTS, dict())])
+def test_fresh_root_does_not_reuse_table(MCTSClass, kwargs):
+    model = get_model()
+    n_playout = 100
+    mcts = MCTSClass(n_playout, reuse_tree=False, use_transposition=True, use_threats=False, use_nn_cache=False, **kwargs)
+
+    # the same position, then the following ones (transpositions of the previous trees)
+    for state in get_states(3):
+        for _ in range(3):
+            childs_n = mcts._search(state, model)
+
+            # the first playout evaluates the root, the others visit a child
+            assert sum(childs_n) == n_playout - 1
+            assert mcts.n_playouts_done == n_playout
+
+def test_gumbel_does_not_reuse_table():
+    model = get_model()
+    n_playout = 32
+    mcts = GumbelMCTS(n_playout, use_transposition=True, use_threats=False, use_nn_cache=False)
+
+    state = get_states(1)[0]
+    for _ in range(3):
+        mcts._search_gumbel(state, model)
+        assert sum(mcts.child_n) == n_playout
+
+    # each search of the same position starts without the positions of the previous one
+    assert mcts.get_search_stats()['tt_hits'] == 0
+
+def test_table_memory_cap():
+    model = get_model()
+    mcts = MCTS(200, use_transposition=True, transposition_mb=0.1, use_threats=False, use_nn_cache=False)
+
+    mcts._search(get_states(1)[0], model)
+    table = mcts.get_table(model)
+
+    assert 0 < table.nbytes <= table.max_nbytes
+    assert table.n_evicted > 0
@@ -0,0 +1,74 @@
+import sys
+import os
+import random
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Omok.state import *
+from Omok.zobrist import *
+from utils.transpose_state import *
+
+def get_random_states(State, n_positions, seed):
+    '''
+    get_random_states(State : class, n_positions : int, seed : int) -> states : list
+
+    every position of seeded random games, until n_positions.
+    '''
+    rng = random.Random(seed)
+    states = []
+
+    while len(states) < n_positions:
+        state = State()
+        while not state.is_done() and len(states) < n_positions:
+            legal_actions = state.get_legal_actions()
+            state = state.next(legal_actions[rng.randrange(len(legal_actions))])
+            states.append(state)
+
+    return states
+
+def get_first_second_boards(state):
+    return (state.player_state, state.enemy_state) if state.is_first_player() else (state.enemy_state, state.player_state)
+
+@pytest.mark.parametrize("bitboard", [False, True])
+def test_no_collisions(bitboard):
+    State = select_state(2, bitboard, (9, 9), 5)
+    symmetry_cells = get_symmetry_cells((9, 9))
+
+    # 100k positions keep the suite fast, utils/benchmark.py check_zobrist_collisions() runs 1M positions of 15x15
+    positions, canonical_boards = {}, {}
+    for state in get_random_states(State, 100_000, seed=0):
+        position = (state.player_state.tobytes(), state.enemy_state.tobytes())
+        assert positions.setdefault(state.get_zobrist_key(), position) == position
+
+        # boards sharing a canonical key are the same board moved by their symmetries
+        canonical_key, symmetry_idx = state.get_canonical_key()
+        canonical_board = np.zeros(state.n_actions, dtype=np.int8)
+        canonical_board[symmetry_cells[symmetry_idx][state.player_state.reshape(-1) != 0]] = 1
+        canonical_board[symmetry_cells[symmetry_idx][state.enemy_state.reshape(-1) != 0]] = 2
+        assert canonical_boards.setdefault(canonical_key, canonical_board.tobytes()) == canonical_board.tobytes()
+
+@pytest.mark.parametrize("state_shape", [(9, 9), (6, 7)])
+def test_incremental_keys(state_shape):
+    State = select_state(2, False, state_shape, 4)
+
+    for state in get_random_states(State, 2_000, seed=1):
+        assert np.array_equal(state.get_zobrist_keys(), compute_zobrist_keys(*get_first_second_boards(state), state_shape))
+
+@pytest.mark.parametrize("state_shape", [(9, 9), (6, 7)])
+def test_symmetry_keys(state_shape):
+    State = select_state(2, False, state_shape, 4)
+
+    for state in get_random_states(State, 2_000, seed=2):
+        keys = state.get_zobrist_keys()
+        first_board, second_board = get_first_second_boards(state)
+
+        for key_idx, idx in enumerate(get_symmetry_idxs(state_shape)):
+            rotate_ftn, _ = get_dihedral_transpose_ftns(idx)
+            moved_boards = [rotate_ftn(board.reshape(1, *state_shape))[0] for board in (first_board, second_board)]
+            moved_keys = compute_zobrist_keys(*moved_boards, state_shape)
+
+            # the key of the moved board is the key of the board seen through idx
+            assert moved_keys[0] == keys[key_idx]
+            assert moved_keys.min() == keys.min()
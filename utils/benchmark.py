@@ -0,0 +1,1046 @@
+import sys
+import os
+import time
+import copy
+import random
+import tracemalloc
+import cProfile
+import pstats
+from math import sqrt
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import *
+from Omok.state import *
+from Omok.MCTS import *
+from Omok.batchedBoard import *
+from Omok.arrayTree import *
+from Omok.parallelMCTS import *
+from Omok.gumbelMCTS import *
+from Omok.selfplay import *
+from Omok.trainer import *
+from Omok.battle import *
+from network.resnet import *
+
+def play_random_games(State, n_games, seed=0):
+    '''
+    play_random_games(State : class, n_games : int, seed : int) -> action_lists : list[list[int]]
+
+    This method plays random games and returns their action sequences, so every engine can replay the same games.
+    '''
+    rng = random.Random(seed)
+    action_lists = []
+
+    for _ in range(n_games):
+        state = State()
+        actions = []
+
+        while not state.is_done():
+            action = rng.choice(list(state.get_legal_actions()))
+            actions.append(action)
+            state = state.next(action)
+
+        action_lists.append(actions)
+
+    return action_lists
+
+def get_random_positions(State, n_positions, seed=0, n_moves=None, min_moves=0, max_share=0.5, unforced=False):
+    '''
+    get_random_positions(State : class, n_positions : int, seed : int, n_moves : int, min_moves : int, max_share : float, unforced : bool) -> positions : list
+
+    This method returns positions of seeded random games, one per game. (see play_random_games())
+    Each game is cut after n_moves moves, or after a random number of moves in [min_moves, max_share * game length) when n_moves is None.
+    Games not longer than min_moves are skipped, and unforced=True skips the positions with forced moves (see get_forced_actions()),
+    so up to 20 games per position are played to find n_positions.
+    '''
+    rng = random.Random(seed)
+    n_games = n_positions * 20 if min_moves > 0 or unforced else n_positions
+    positions = []
+
+    for actions in play_random_games(State, n_games, seed):
+        if len(actions) <= min_moves:
+            continue
+
+        n_cut = n_moves if n_moves is not None else rng.randrange(min_moves, max(int(len(actions) * max_share), min_moves + 1))
+
+        state = State()
+        for action in actions[:n_cut]:
+            state = state.next(action)
+
+        if not unforced or state.get_forced_actions()[0] is None:
+            positions.append(state)
+        if len(positions) == n_positions:
+            break
+
+    return positions
+
+def get_random_network(n_residual_block, n_kernel, seed=0, policy_scale=None):
+    '''
+    get_random_network(n_residual_block : int, n_kernel : int, seed : int, policy_scale : float) -> model : nn.Module
+
+    This method returns an untrained network made by torch.manual_seed(seed).
+    policy_scale scales its policy head, so its policy is as sharp as the one of a trained network. (None : as made)
+    '''
+    torch.manual_seed(seed)
+    model = Network(n_residual_block, n_kernel, STATE_DIM, N_ACTIONS)
+
+    if policy_scale is not None:
+        with torch.no_grad():
+            for param in model.policy_head.parameters():
+                param.mul_(policy_scale)
+
+    return model
+
+def get_selfplay(model, n_games, n_playout, mcts, playout_cap=False):
+    '''
+    get_selfplay(model : nn.Module, n_games : int, n_playout : int, mcts : MCTS, playout_cap : bool) -> selfplay : Selfplay
+
+    Selfplay of TRAIN_TEMPERATURE searching by mcts, whose games are played by selfplay._single_play().
+    '''
+    selfplay = get_selfplay_class()(model, TRAIN_TEMPERATURE, n_games, n_playout, playout_cap)
+    selfplay.mcts = mcts
+
+    return selfplay
+
+def bench_state(State, action_lists):
+    '''
+    bench_state(State : class, action_lists : list[list[int]]) -> (next_per_sec, is_done_per_sec) : tuple[float]
+
+    This method replays the games and measures the throughput of next() and is_done().
+    '''
+    n_moves = sum(len(actions) for actions in action_lists)
+
+    # next()
+    start = time.perf_counter()
+    states = []
+    for actions in action_lists:
+        state = State()
+        for action in actions:
+            state = state.next(action)
+            states.append(state)
+    next_per_sec = n_moves / (time.perf_counter() - start)
+
+    # is_done() without cached draw, lose condition (win condition is inherited by next())
+    for state in states:
+        state.done_condition[1:] = [None, None]
+
+    start = time.perf_counter()
+    for state in states:
+        state.is_done()
+    is_done_per_sec = n_moves / (time.perf_counter() - start)
+
+    return next_per_sec, is_done_per_sec
+
+def compare_state_engines(n_games=200, n_dim=STATE_DIM):
+    '''
+    compare_state_engines(n_games : int, n_dim : int)
+        > print : next(), is_done() throughput of array & bitboard state.
+    '''
+    action_lists = play_random_games(select_state(n_dim), n_games)
+
+    for name, bitboard in (('array', False), ('bitboard', True)):
+        next_per_sec, is_done_per_sec = bench_state(select_state(n_dim, bitboard=bitboard), action_lists)
+        print(f"{name:>8} | next : {next_per_sec:10.0f} /s | is_done : {is_done_per_sec:10.0f} /s")
+
+def compare_win_detection(n_games=200, n_dim=STATE_DIM):
+    '''
+    compare_win_detection(n_games : int, n_dim : int)
+        > print : time per is_lose() query by full board scan & by the lines through next_action.
+    '''
+    State = select_state(n_dim, bitboard=False)
+    action_lists = play_random_games(State, n_games)
+
+    states = []
+    for actions in action_lists:
+        state = State()
+        for action in actions:
+            state = state.next(action)
+            states.append(state)
+
+    for name, check in (('full scan', lambda s: s._check_winning_condition(s.enemy_state)),
+                        ('last move', lambda s: s._check_winning_condition_with_action(s.enemy_state))):
+        start = time.perf_counter()
+        results = [check(state) for state in states]
+        elapsed = time.perf_counter() - start
+        print(f"{name:>9} | {elapsed / len(states) * 1e6:8.2f} us / query | n_win : {sum(results)}")
+
+def compare_batched_board(n_games=256, seed=0):
+    '''
+    compare_batched_board(n_games : int, seed : int)
+        > print : moves/sec of n_games random games by State objects & by one BatchedBoard.
+    '''
+    rng = np.random.default_rng(seed)
+
+    # State objects, one game at a time
+    State = select_state(STATE_DIM)
+    start, n_moves = time.perf_counter(), 0
+    for _ in range(n_games):
+        state = State()
+        while not state.is_done():
+            legal_actions = state.get_legal_actions()
+            state = state.next(legal_actions[rng.integers(len(legal_actions))])
+            n_moves += 1
+    print(f"{'State':>12} | {n_moves / (time.perf_counter() - start):10.0f} moves/s")
+
+    # BatchedBoard, every game in lockstep
+    board = BatchedBoard(n_games)
+    start = time.perf_counter()
+    while not board.terminal().all():
+        board.step(np.argmax(rng.random((n_games, board.n_actions)) * board.legal_mask(), axis=1))
+    print(f"{'BatchedBoard':>12} | {board.n_stones.sum() / (time.perf_counter() - start):10.0f} moves/s")
+
+def compare_encoding(n_games=50, n_dim=STATE_DIM):
+    '''
+    compare_encoding(n_games : int, n_dim : int)
+        > print : time per state of __call__() + torch.tensor(), encode() into a reused buffer, and encode_states().
+    '''
+    State = select_state(n_dim)
+    states = []
+    for actions in play_random_games(State, n_games):
+        state = State()
+        for action in actions:
+            state = state.next(action)
+            states.append(state)
+
+    x, x_array = get_input_buffer(1, n_dim, STATE_SHAPE, torch.device('cpu'))
+    batch = np.empty((len(states), n_dim, *STATE_SHAPE), dtype=np.float32)
+
+    def call_and_tensor():
+        for state in states:
+            torch.tensor(state(), dtype=torch.float32).reshape(1, -1, *STATE_SHAPE)
+
+    def encode_into_buffer():
+        for state in states:
+            state.encode(x_array[0])
+
+    for name, ftn in (('__call__ + tensor', call_and_tensor),
+                      ('encode (buffer)', encode_into_buffer),
+                      ('encode_states', lambda: encode_states(states, batch))):
+        start = time.perf_counter()
+        ftn()
+        print(f"{name:>17} | {(time.perf_counter() - start) / len(states) * 1e6:7.2f} us / state")
+
+def check_zobrist_collisions(n_positions=1_000_000, seed=0):
+    '''
+    check_zobrist_collisions(n_positions : int, seed : int) -> (n_collisions, n_canonical_collisions) : tuple[int]
+        > print : distinct positions, collisions of key & canonical key, bit balance of keys.
+
+    This method visits positions of random games, and counts different positions sharing the same key.
+    Canonical keys collide only when their canonical boards (board moved by symmetry_idx) differ.
+    '''
+    State = select_state(STATE_DIM, bitboard=True)
+    symmetry_cells = get_symmetry_cells(STATE_SHAPE)
+    rng = random.Random(seed)
+
+    positions, canonical_boards = {}, {}
+    n_collisions, n_canonical_collisions, n_visited = 0, 0, 0
+
+    while n_visited < n_positions:
+        state = State()
+
+        while not state.is_done() and n_visited < n_positions:
+            legal_actions = state.get_legal_actions()
+            state = state.next(legal_actions[rng.randrange(len(legal_actions))])
+            n_visited += 1
+
+            # key
+            key, position = state.get_zobrist_key(), (state.player_bits, state.enemy_bits)
+            if positions.setdefault(key, position) != position:
+                n_collisions += 1
+
+            # canonical key
+            canonical_key, symmetry_idx = state.get_canonical_key()
+            canonical_board = np.zeros(state.n_actions, dtype=np.int8)
+            canonical_board[symmetry_cells[symmetry_idx][state.player_state.reshape(-1) != 0]] = 1
+            canonical_board[symmetry_cells[symmetry_idx][state.enemy_state.reshape(-1) != 0]] = 2
+            if canonical_boards.setdefault(canonical_key, canonical_board.tobytes()) != canonical_board.tobytes():
+                n_canonical_collisions += 1
+
+    keys = np.array(list(positions.keys()), dtype=np.uint64)
+    bit_rates = ((keys[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)).mean(axis=0)
+
+    print(f"positions : {n_visited} (distinct : {len(positions)}) | collisions : {n_collisions} | canonical collisions : {n_canonical_collisions}")
+    print(f"bit rate of keys : min {bit_rates.min():.4f} / max {bit_rates.max():.4f} (ideal 0.5)")
+
+    return n_collisions, n_canonical_collisions
+
+def bench_mcts(mcts, model, state=None, temp=1.0):
+    '''
+    bench_mcts(mcts : MCTS, model : nn.Module, state : class, temp : float) -> (playouts_per_sec, peak_mb) : tuple[float]
+
+    This method measures playouts/sec of a single get_legal_policy() call,
+    and the peak memory (traced by tracemalloc) allocated while the tree grows.
+    '''
+    state = select_state(STATE_DIM)() if state is None else state
+
+    # speed
+    start = time.perf_counter()
+    mcts.get_legal_policy(state, model, temp)
+    playouts_per_sec = mcts.n_playout / (time.perf_counter() - start)
+
+    # memory (tracemalloc slows the search, so it is measured separately)
+    tracemalloc.start()
+    mcts.get_legal_policy(state, model, temp)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return playouts_per_sec, peak / 2**20
+
+def compare_mcts(n_playouts=(400, 1600), n_residual_block=2, n_kernel=32):
+    '''
+    compare_mcts(n_playouts : tuple, n_residual_block : int, n_kernel : int)
+        > print : playouts/sec & peak memory of MCTS.
+
+    A small network is used by default, so the time of the tree itself is not hidden by the nn.
+    '''
+    model = get_random_network(n_residual_block, n_kernel)
+
+    for n_playout in n_playouts:
+        playouts_per_sec, peak_mb = bench_mcts(MCTS(n_playout), model)
+        print(f"MCTS({n_playout:>5}) | {playouts_per_sec:8.1f} playouts/s | peak mem : {peak_mb:7.2f} MB")
+
+def compare_board_sizes(sizes=(9, 13, 15, 19), n_games=50, n_dim=STATE_DIM):
+    '''
+    compare_board_sizes(sizes : tuple, n_games : int, n_dim : int)
+        > print : time per move of next() + is_done() + get_legal_actions() for each board size.
+
+    Win detection & legal actions are updated around the last move, so the time per move should stay flat while the board grows.
+    '''
+    for name, bitboard in (('array', False), ('bitboard', True)):
+        for size in sizes:
+            State = select_state(n_dim, bitboard=bitboard, state_shape=(size, size))
+            action_lists = play_random_games(State, n_games)
+            n_moves = sum(len(actions) for actions in action_lists)
+
+            start = time.perf_counter()
+            for actions in action_lists:
+                state = State()
+                for action in actions:
+                    state = state.next(action)
+                    state.is_done()
+                    state.get_legal_actions()
+            elapsed = time.perf_counter() - start
+
+            print(f"{name:>8} | {size:>2}x{size:<2} | {elapsed / n_moves * 1e6:7.2f} us / move")
+
+
+def compare_threat_search(n_positions=20, n_playout=400, n_games=4, n_residual_block=2, n_kernel=32, seed=0):
+    '''
+    compare_threat_search(n_positions : int, n_playout : int, n_games : int, n_residual_block : int, n_kernel : int, seed : int)
+        > print : playouts-to-decision on forced positions & self play time per game, with / without threat detection.
+
+    playouts-to-decision is the number of playouts after which the most visited action stays in the forced actions.
+    '''
+    model = get_random_network(n_residual_block, n_kernel)
+    State = select_state(STATE_DIM)
+    rng = random.Random(seed)
+
+    # forced positions of random games
+    positions = []
+    while len(positions) < n_positions:
+        state = State()
+        while not state.is_done():
+            if state.get_forced_actions()[0] is not None:
+                positions.append(state)
+                break
+            legal_actions = state.get_legal_actions()
+            state = state.next(legal_actions[rng.randrange(len(legal_actions))])
+
+    # playouts-to-decision of the tree search (the solver is off, so only the threat detection differs)
+    for name, use_threats in (('without threats', False), ('with threats', True)):
+        n_decisions = []
+        for state in positions:
+            forced_actions = set(state.get_forced_actions()[0].tolist())
+            root_node, n_decision = Node(state, 1.0), 0
+
+            for n in range(1, n_playout + 1):
+                root_node.evaluate_value(model, use_threats, solver=False)
+                child_n = get_n_child(root_node.child_nodes)
+                if root_node.child_nodes[int(np.argmax(child_n))].action not in forced_actions:
+                    n_decision = n + 1
+            n_decisions.append(min(n_decision, n_playout))
+
+        print(f"{name:>15} | playouts-to-decision : mean {np.mean(n_decisions):7.1f} / max {max(n_decisions)} (of {n_playout})")
+
+    # playouts run by get_legal_policy() (forced roots are not searched with threat detection)
+    for name, use_threats in (('without threats', False), ('with threats', True)):
+        mcts = MCTS(n_playout, use_threats, reuse_tree=False, use_nn_cache=False, early_stop=False)
+        n_playouts = []
+        for state in positions:
+            mcts.get_legal_policy(state, model, 1.0)
+            n_playouts.append(mcts.n_playouts_done)
+
+        print(f"{name:>15} | playouts per forced move : mean {np.mean(n_playouts):7.1f} / max {max(n_playouts)} (of {n_playout})")
+
+    # self play time
+    for name, use_threats in (('without threats', False), ('with threats', True)):
+        random.seed(seed), np.random.seed(seed)
+        selfplay = get_selfplay(model, n_games, n_playout, MCTS(n_playout, use_threats))
+
+        start = time.perf_counter()
+        for _ in range(n_games):
+            selfplay._single_play()
+        elapsed = time.perf_counter() - start
+
+        print(f"{name:>15} | self play : {elapsed / n_games:6.2f} s / game | {elapsed / sum(selfplay.n_steps) * 1e3:7.1f} ms / move | n_steps : {np.mean(selfplay.n_steps):5.1f}")
+
+def compare_leaf_batch(n_batches=(1, 8, 16, 32), n_playout=N_PLAYOUT, n_positions=5, n_residual_block=N_RESIDUAL_BLOCK, n_kernel=N_KERNEL, seed=0):
+    '''
+    compare_leaf_batch(n_batches : tuple, n_playout : int, n_positions : int, n_residual_block : int, n_kernel : int, seed : int)
+        > print : playouts/sec of MCTS for each n_batch, and how far its visits are from the sequential search(n_batch=1).
+
+    move agreement : the most visited action is the same as the sequential search.
+    visit distance : total variation distance between the visit distributions.
+    '''
+    model = get_random_network(n_residual_block, n_kernel, seed)
+    State = select_state(STATE_DIM)
+
+    # positions of random games (threat detection is off, so every position is searched)
+    positions = get_random_positions(State, n_positions, seed)
+
+    sequential_visits = None
+
+    for n_batch in n_batches:
+        mcts = MCTS(n_playout, use_threats=False, n_batch=n_batch)
+        visits, elapsed = [], 0
+
+        for state in positions:
+            start = time.perf_counter()
+            mcts.get_legal_policy(state, model, 1.0)
+            elapsed += time.perf_counter() - start
+            visits.append(np.array(mcts.child_n) / sum(mcts.child_n))
+
+        if sequential_visits is None:
+            sequential_visits = visits
+
+        agreement = np.mean([np.argmax(v) == np.argmax(s) for v, s in zip(visits, sequential_visits)])
+        distance = np.mean([np.abs(v - s).sum() / 2 for v, s in zip(visits, sequential_visits)])
+
+        print(f"n_batch {n_batch:>3} | {n_playout * len(positions) / elapsed:8.1f} playouts/s | move agreement : {agreement:4.2f} | visit distance : {distance:5.3f}")
+
+def count_nodes(node):
+    '''
+    count_nodes(node : Node) -> n_nodes : int
+    '''
+    return 1 + sum(count_nodes(child_node) for child_node in node.child_nodes)
+
+def compare_tree_storage(n_playouts=(400, 1600), n_batch=N_LEAF_BATCH, n_residual_block=2, n_kernel=32):
+    '''
+    compare_tree_storage(n_playouts : tuple, n_batch : int, n_residual_block : int, n_kernel : int)
+        > print : playouts/sec, number of nodes & memory per node of the Node tree and ArrayTree.
+
+    memory per node is the peak memory (traced by tracemalloc) of a search from scratch divided by its nodes,
+    so the states made while the tree grows are included for both trees.
+    '''
+    model = get_random_network(n_residual_block, n_kernel)
+    state = select_state(STATE_DIM)()
+
+    for n_playout in n_playouts:
+        for name, mcts in (('Node', MCTS(n_playout, False, n_batch)), ('ArrayTree', ArrayMCTS(n_playout, False, n_batch))):
+            # memory of a search from scratch
+            tracemalloc.start()
+            if name == 'Node':
+                root_node = Node(state, 1.0)
+                if n_batch == 1:
+                    for _ in range(n_playout):
+                        root_node.evaluate_value(model, False)
+                else:
+                    mcts._search_batched(root_node, model)
+                n_nodes = count_nodes(root_node)
+            else:
+                mcts = ArrayMCTS(n_playout, False, n_batch)
+                mcts._search(state, model)
+                n_nodes = mcts.tree.size
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            # speed (ArrayTree reuses its storage)
+            start = time.perf_counter()
+            mcts.get_legal_policy(state, model, 1.0)
+            playouts_per_sec = n_playout / (time.perf_counter() - start)
+
+            print(f"{name:>9}({n_playout:>5}) | {playouts_per_sec:8.1f} playouts/s | nodes : {n_nodes:7d} | {peak / n_nodes:7.1f} bytes / node")
+
+def select_puct_by_loop(child_n, child_w, child_p):
+    '''
+    select_puct_by_loop(child_n : list, child_w : list, child_p : list) -> max_indices : np.ndarray
+
+    The PUCT selection before select_puct() (python loop over child nodes), returning every index of the max value.
+    '''
+    total_visit = sum(child_n)
+
+    values = []
+
+    for n, w, p in zip(child_n, child_w, child_p):
+        q_value = -(w / n) if n != 0 else 0
+        node_value = q_value + C_PUCT * p * sqrt(total_visit) / (1 + n)
+        values.append(node_value)
+
+    arr = np.array(values)
+    return np.where(arr == arr.max())[0]
+
+def compare_puct_selection(n_children=(9, 81, 361), n_trials=2000, seed=0):
+    '''
+    compare_puct_selection(n_children : tuple, n_trials : int, seed : int)
+        > print : time per selection of the python loop & select_puct(), and how often they choose the same child.
+    '''
+    rng = np.random.default_rng(seed)
+
+    for n_child in n_children:
+        stats = []
+        for _ in range(n_trials):
+            child_n = rng.integers(0, 30, n_child) * (rng.random(n_child) < 0.5)
+            child_w = rng.uniform(-1, 1, n_child) * child_n
+            child_p = rng.dirichlet(np.ones(n_child)).astype(np.float32) # priors of predict() are float32
+            stats.append((child_n, child_w, child_p))
+
+        loop_stats = [(n.tolist(), w.tolist(), list(p)) for n, w, p in stats]
+        vector_stats = [(n, w, p.astype(np.float64)) for n, w, p in stats]
+
+        start = time.perf_counter()
+        max_indices = [select_puct_by_loop(*stat) for stat in loop_stats]
+        loop_time = (time.perf_counter() - start) / n_trials
+
+        start = time.perf_counter()
+        choices = [select_puct(*stat) for stat in vector_stats]
+        vector_time = (time.perf_counter() - start) / n_trials
+
+        agreement = np.mean([choice in indices for choice, indices in zip(choices, max_indices)])
+        print(f"children {n_child:>3} | loop : {loop_time * 1e6:7.2f} us | select_puct : {vector_time * 1e6:6.2f} us | same choice : {agreement:6.4f}")
+
+
+def compare_tree_reuse(n_playout=N_PLAYOUT, n_games=2, temp=EVAL_TEMPERATURE, n_residual_block=2, n_kernel=32, seed=0):
+    '''
+    compare_tree_reuse(n_playout : int, n_games : int, temp : float, n_residual_block : int, n_kernel : int, seed : int)
+        > print : reused visits, visits of the root & time per move of self-play games by a fresh tree and by a reused tree.
+
+    reuse : n_playout new playouts on top of the reused visits. (same time per move, deeper search)
+    reuse (counted) : reused visits count toward n_playout. (same visits of the root, less time per move)
+    '''
+    model = get_random_network(n_residual_block, n_kernel, seed)
+    State = select_state(STATE_DIM)
+
+    for name, reuse_tree, count_reused in (("fresh", False, False), ("reuse", True, False), ("reuse (counted)", True, True)):
+        np.random.seed(seed)
+        random.seed(seed)
+        mcts = MCTS(n_playout, reuse_tree=reuse_tree, count_reused=count_reused)
+        n_reused, root_n, elapsed = [], [], 0
+
+        for _ in range(n_games):
+            state = State()
+            mcts.reset_tree()
+
+            while not state.is_done():
+                start = time.perf_counter()
+                legal_policy = mcts.get_legal_policy(state, model, temp)
+                elapsed += time.perf_counter() - start
+
+                n_reused.append(mcts.n_reused)
+                root_n.append(sum(mcts.child_n))
+                state = state.next(int(np.random.choice(state.get_legal_actions(), p=legal_policy)))
+
+        print(f"{name:<16} | reused visits : {np.mean(n_reused):7.1f} | root visits : {np.mean(root_n):7.1f} | {elapsed / len(root_n) * 1e3:7.1f} ms/move")
+
+def compare_transposition(n_playout=1600, n_positions=5, n_moves=10, policy_scale=20, n_residual_block=2, n_kernel=32, seed=0):
+    '''
+    compare_transposition(n_playout : int, n_positions : int, n_moves : int, policy_scale : float, n_residual_block : int, n_kernel : int, seed : int)
+        > print : playouts/sec, hit rate & memory of the transposition table, with & without it.
+
+    The policy head of the random network is scaled by policy_scale, so its policy is as sharp as a trained one,
+    and the tree is deep enough for transpositions. (a flat policy rarely searches 3 plies deep)
+    A hit is a playout which takes the nn value of a transposed position instead of calling the nn.
+    '''
+    model = get_random_network(n_residual_block, n_kernel, seed, policy_scale)
+
+    State = select_state(STATE_DIM)
+
+    # positions after n_moves of random games (threat detection is off, so every position is searched)
+    positions = get_random_positions(State, n_positions, seed, n_moves=n_moves)
+
+    for use_transposition in (False, True):
+        mcts = MCTS(n_playout, use_threats=False, reuse_tree=False, use_transposition=use_transposition)
+        for state in positions:
+            mcts.get_legal_policy(state, model, 1.0)
+
+        stats = mcts.get_search_stats()
+        info = f"transposition {str(use_transposition):<5} | {stats['playouts_per_sec']:8.1f} playouts/s"
+        if use_transposition:
+            info += f" | hit rate : {stats['tt_hit_rate']:.3f} | nn calls saved : {stats['tt_hits']} / {stats['playouts']}"
+            info += f" | size : {stats['tt_size']} ({stats['tt_nbytes'] / 2**20:.1f} MB)"
+        print(info)
+
+def compare_nn_cache(n_playout=N_PLAYOUT, n_positions=10, n_residual_block=2, n_kernel=32, seed=0):
+    '''
+    compare_nn_cache(n_playout : int, n_positions : int, n_residual_block : int, n_kernel : int, seed : int)
+        > print : time per search, nn evaluations & hit rate without nn_cache, with a cold cache and with a warm cache.
+
+    cold : every position is searched once, hits are symmetric or repeated positions within the searches.
+    warm : the same positions are searched again by a fresh tree. (e.g. the other eval game, the previous move's search)
+    '''
+    model = get_random_network(n_residual_block, n_kernel, seed)
+    State = select_state(STATE_DIM)
+
+    # positions of random games (threat detection is off, so every position is searched)
+    positions = get_random_positions(State, n_positions, seed)
+
+    nn_cache.clear()
+
+    for name, use_nn_cache in (("off", False), ("cold", True), ("warm", True)):
+        random.seed(seed)
+        mcts = MCTS(n_playout, use_threats=False, reuse_tree=False, use_nn_cache=use_nn_cache)
+        hits, misses = nn_cache.hits, nn_cache.misses
+
+        start = time.perf_counter()
+        for state in positions:
+            mcts.get_legal_policy(state, model, 1.0)
+        elapsed = time.perf_counter() - start
+
+        info = f"nn cache {name:<4} | {elapsed / len(positions) * 1e3:7.1f} ms/search"
+        if use_nn_cache:
+            n_hits, n_misses = nn_cache.hits - hits, nn_cache.misses - misses
+            info += f" | nn evals : {n_misses:5d} | hit rate : {n_hits / (n_hits + n_misses):.3f} | {nn_cache.nbytes / 2**20:.1f} MB"
+        print(info)
+
+def evaluate_value_by_recursion(node, model, use_threats=USE_THREAT_DETECTION):
+    '''
+    evaluate_value_by_recursion(node : Node, model : nn.Module, use_threats : bool) -> value : float
+
+    The playout before Node.evaluate_value() became a loop (a call per tree level, is_done() at every level).
+    '''
+    if node.state.is_done() or len(node.child_nodes) == 0:
+        value = node.evaluate_leaf(use_threats)
+
+        if value is None:
+            legal_policy, value = predict(model, node.state)
+
+            if len(node.child_nodes) == 0:
+                node.expand(node.state.get_legal_actions(), legal_policy)
+
+    else:
+        child_node = node._select_next_child_node()
+
+        if child_node.state is None:
+            child_node.state = node.state.next(child_node.action)
+
+        value = - evaluate_value_by_recursion(child_node, model, use_threats)
+
+    node.n += 1
+    node.w += value
+
+    return value
+
+def compare_playout_loop(n_playout=1600, n_positions=3, n_rounds=3, n_residual_block=1, n_kernel=8, seed=0):
+    '''
+    compare_playout_loop(n_playout : int, n_positions : int, n_rounds : int, n_residual_block : int, n_kernel : int, seed : int)
+        > print : profiled driver time & function calls per playout, and visit agreement of both playout drivers.
+
+    Both drivers search the same positions sequentially under cProfile with the same random seed. (threat detection off)
+    driver time is the total time minus the cumulative time of the work both drivers share 
+    (predict(), expand(), state.next(), PUCT selection), i.e. walking down, checking the leaf & backing up.
+    The best of n_rounds is taken for each driver.
+    '''
+    model = get_random_network(n_residual_block, n_kernel, seed)
+    State = select_state(STATE_DIM)
+
+    positions = get_random_positions(State, n_positions, seed)
+
+    drivers = (("recursive", lambda root_node: evaluate_value_by_recursion(root_node, model, False)), 
+               ("loop", lambda root_node: root_node.evaluate_value(model, False)))
+    shared_funcs = ('predict', 'expand', 'next', '_select_next_child_node')
+    results = {name : [] for name, _ in drivers}
+    visits = {}
+
+    for _ in range(n_rounds):
+        for name, playout in drivers:
+            random.seed(seed)
+            profiler = cProfile.Profile()
+            visits[name] = []
+
+            for state in positions:
+                # fresh states, so no is_done() result is cached by the other driver
+                root_node = Node(State(state.player_state, state.enemy_state), 1.0)
+
+                profiler.enable()
+                for _ in range(n_playout):
+                    playout(root_node)
+                profiler.disable()
+
+                visits[name].append(get_n_legal(root_node))
+
+            stats = pstats.Stats(profiler)
+            shared_time = sum(stat[3] for func, stat in stats.stats.items() if func[2] in shared_funcs)
+            shared_calls = sum(stat[1] for func, stat in stats.stats.items() if func[2] in shared_funcs)
+            n_playouts = n_playout * len(positions)
+
+            results[name].append(((stats.total_tt - shared_time) / n_playouts, stats.total_calls / n_playouts, shared_time / n_playouts))
+
+    for name, _ in drivers:
+        driver_time, n_calls, shared_time = min(results[name])
+        print(f"{name:<9} | driver time : {driver_time * 1e6:6.1f} us/playout | shared time : {shared_time * 1e6:6.1f} us/playout | calls : {n_calls:6.1f} /playout")
+
+    agreement = np.mean([a == b for a, b in zip(visits["recursive"], visits["loop"])])
+    print(f"same visits : {agreement:.2f}")
+
+def compare_time_limit(time_limits=(0.25, 0.5, 1.0), n_playout=N_PLAYOUT, n_positions=5, n_residual_block=N_RESIDUAL_BLOCK, n_kernel=N_KERNEL, seed=0):
+    '''
+    compare_time_limit(time_limits : tuple, n_playout : int, n_positions : int, n_residual_block : int, n_kernel : int, seed : int)
+        > print : mean & max time per move and playouts achieved by n_playout playouts and by each time limit.
+
+    The default network is used, so the latency is the one of the web server on this host.
+    '''
+    model = get_random_network(n_residual_block, n_kernel, seed)
+    State = select_state(STATE_DIM)
+
+    positions = get_random_positions(State, n_positions, seed)
+
+    settings = [(f"{n_playout} playouts", MCTS(n_playout, use_threats=False, reuse_tree=False, use_nn_cache=False))]
+    settings += [(f"{time_limit} sec", MCTS(None, use_threats=False, reuse_tree=False, use_nn_cache=False, time_limit=time_limit)) for time_limit in time_limits]
+
+    for name, mcts in settings:
+        elapsed, n_playouts = [], []
+
+        for state in positions:
+            start = time.perf_counter()
+            mcts.get_legal_policy(state, model, 0)
+            elapsed.append(time.perf_counter() - start)
+            n_playouts.append(mcts.n_playouts_done)
+
+        print(f"{name:<14} | mean : {np.mean(elapsed):6.3f} sec | max : {np.max(elapsed):6.3f} sec | playouts : {np.mean(n_playouts):7.1f}")
+
+def compare_early_stop(n_playout=N_PLAYOUT, n_games=2, stop_confidences=(None, 0.5), policy_scale=20, n_residual_block=2, n_kernel=32, seed=0):
+    '''
+    compare_early_stop(n_playout : int, n_games : int, stop_confidences : tuple, policy_scale : float, n_residual_block : int, n_kernel : int, seed : int)
+        > print : playouts saved, time per move & move agreement with the full search of greedy games, like EvalNetwork.
+
+    Each move is searched by the full search and by the early stop from the same random seed. (trees are not reused)
+    The policy head is scaled by policy_scale, so the visits are as concentrated as the ones of a trained network.
+    '''
+    model = get_random_network(n_residual_block, n_kernel, seed, policy_scale)
+
+    State = select_state(STATE_DIM)
+    settings = [("full", MCTS(n_playout, reuse_tree=False, use_nn_cache=False, early_stop=False))]
+    settings += [(f"early stop ({stop_confidence})", MCTS(n_playout, reuse_tree=False, use_nn_cache=False, stop_confidence=stop_confidence)) 
+                 for stop_confidence in stop_confidences]
+
+    elapsed = {name : 0.0 for name, _ in settings}
+    n_agree, n_moves = {name : 0 for name, _ in settings}, 0
+
+    for game in range(n_games):
+        state = State()
+
+        while not state.is_done():
+            actions = {}
+
+            for name, mcts in settings:
+                random.seed(seed + n_moves)
+                start = time.perf_counter()
+                actions[name] = argmax(mcts.get_legal_policy(state, model, 0))
+                elapsed[name] += time.perf_counter() - start
+
+            for name, _ in settings:
+                n_agree[name] += actions[name] == actions["full"]
+
+            n_moves += 1
+            state = state.next(int(state.get_legal_actions()[actions["full"]]))
+
+    for name, mcts in settings:
+        stats = mcts.get_search_stats()
+        print(f"{name:<18} | saved : {stats['saved_rate']:6.1%} | {elapsed[name] / n_moves * 1e3:7.1f} ms/move | move agreement : {n_agree[name] / n_moves:4.2f}")
+
+def compare_search_threads(n_threads=(1, 2, 4, 8), n_batch=8, n_playout=N_PLAYOUT, n_positions=5, n_residual_block=N_RESIDUAL_BLOCK, n_kernel=N_KERNEL, seed=0):
+    '''
+    compare_search_threads(n_threads : tuple, n_batch : int, n_playout : int, n_positions : int, n_residual_block : int, n_kernel : int, seed : int)
+        > print : playouts/sec of ParallelMCTS for each number of threads, against MCTS(n_batch=1) & MCTS(n_batch=n_batch).
+
+    batch : mean leaves evaluated by a single nn call.
+    move agreement : the most visited action is the same as the sequential search.
+    '''
+    model = get_random_network(n_residual_block, n_kernel, seed)
+    State = select_state(STATE_DIM)
+
+    positions = get_random_positions(State, n_positions, seed)
+
+    kwargs = dict(use_threats=False, reuse_tree=False, use_nn_cache=False)
+    settings = [("sequential", MCTS(n_playout, n_batch=1, **kwargs)), (f"n_batch {n_batch}", MCTS(n_playout, n_batch=n_batch, **kwargs))]
+    settings += [(f"{n_thread} threads", ParallelMCTS(n_playout, n_threads=n_thread, **kwargs)) for n_thread in n_threads]
+
+    print(f"cpu cores : {os.cpu_count()} | torch threads : {torch.get_num_threads()}")
+    sequential_actions, one_thread_speed = None, None
+
+    for name, mcts in settings:
+        actions, elapsed = [], 0
+
+        for state in positions:
+            start = time.perf_counter()
+            mcts.get_legal_policy(state, model, 1.0)
+            elapsed += time.perf_counter() - start
+            actions.append(np.argmax(mcts.child_n))
+
+        speed = n_playout * len(positions) / elapsed
+        if sequential_actions is None:
+            sequential_actions = actions
+
+        line = f"{name:<12} | {speed:8.1f} playouts/s | move agreement : {np.mean(np.array(actions) == np.array(sequential_actions)):4.2f}"
+        if isinstance(mcts, ParallelMCTS):
+            one_thread_speed = one_thread_speed or speed
+            line += f" | batch : {n_playout * len(positions) / mcts.n_nn_calls:5.2f} | speedup : {speed / one_thread_speed:4.2f}x"
+        print(line)
+
+def compare_root_parallel(n_workers=(1, 2, 4), n_playout=N_PLAYOUT, n_positions=12, policy_scale=5, n_residual_block=2, n_kernel=32, seed=0):
+    '''
+    compare_root_parallel(n_workers : tuple, n_playout : int, n_positions : int, policy_scale : float, n_residual_block : int, n_kernel : int, seed : int)
+        > print : time per move & playouts/sec of RootParallelMCTS for each number of workers.
+
+    reference agreement : the most visited action is the one of a single search with n_playout * max(n_workers) playouts. (as the strength)
+    The pools are started before the timing, and trees are not reused.
+    '''
+    model = get_random_network(n_residual_block, n_kernel, seed, policy_scale)
+
+    State = select_state(STATE_DIM)
+
+    positions = get_random_positions(State, n_positions, seed)
+
+    kwargs = dict(use_threats=False, reuse_tree=False, use_nn_cache=False, early_stop=False)
+    reference = MCTS(n_playout * max(n_workers), **kwargs)
+    reference_actions = [argmax(reference._search(state, model)) for state in positions]
+
+    print(f"cpu cores : {os.cpu_count()}")
+
+    for n_worker in n_workers:
+        mcts = RootParallelMCTS(n_playout, n_workers=n_worker, seed=seed, **kwargs)
+        mcts._search(positions[0], model) # start the workers
+
+        elapsed, n_agree = [], 0
+        for state, reference_action in zip(positions, reference_actions):
+            start = time.perf_counter()
+            mcts.get_legal_policy(state, model, 0)
+            elapsed.append(time.perf_counter() - start)
+            n_agree += argmax(mcts.child_n) == reference_action
+
+        mcts.close()
+        print(f"{n_worker} workers | {np.mean(elapsed):6.3f} sec/move | {n_playout * n_worker / np.mean(elapsed):8.1f} playouts/s | reference agreement : {n_agree / len(positions):4.2f}")
+
+def compare_pondering(n_games=2, think_time=2.0, human_moves=("policy", "random"), policy_scale=20, seed=0):
+    '''
+    compare_pondering(n_games : int, think_time : float, human_moves : tuple, policy_scale : float, seed : int)
+        > print : time-to-reply of the web server with & without pondering, by a scripted client. (app.test_client)
+
+    The client plays black, and thinks think_time sec before each move.
+    human move "policy" : the best move of the nn policy (an opponent the search can predict), "random" : a random empty cell.
+    The server loads models/latest_model_weight.pth and uses its own settings (N_PLAYOUT, MOVE_TIME_LIMIT, N_SEARCH_THREADS).
+    Its policy head is scaled by policy_scale (None : as loaded), so the visits are as concentrated as the ones of a trained network.
+    '''
+    from web import server
+
+    if policy_scale is not None:
+        with torch.no_grad():
+            for param in server.model.policy_head.parameters():
+                param.mul_(policy_scale)
+        nn_cache.invalidate(server.model)
+
+    client = server.app.test_client()
+
+    for human_move in human_moves:
+        for pondering in (False, True):
+            server.pondering = pondering
+            server.mcts.count_reused = pondering
+
+            rng = random.Random(seed)
+            elapsed, n_playouts = [], []
+
+            for game in range(n_games):
+                client.post('/reset-board')
+
+                while True:
+                    time.sleep(think_time)
+                    legal_actions = server.state.get_legal_actions()
+
+                    if human_move == "policy":
+                        legal_policy, _ = predict(server.model, server.state)
+                        action = int(legal_actions[argmax(legal_policy)])
+                    else:
+                        action = int(rng.choice(legal_actions))
+
+                    x, y = divmod(action, server.board.shape[2])
+
+                    start = time.perf_counter()
+                    response = client.post('/update-board', json={"x" : x, "y" : y, "isWhite" : 0}).get_json()
+
+                    if response["game_result"] != 2 and response["is_AI"] == 0:
+                        break
+
+                    elapsed.append(time.perf_counter() - start)
+                    n_playouts.append(server.mcts.n_playouts_done)
+
+                    if response["game_result"] != 2:
+                        break
+
+            client.post('/reset-board')
+            print(f"{human_move:<6} moves | pondering {str(pondering):<5} | time-to-reply mean : {np.mean(elapsed):6.3f} sec | max : {np.max(elapsed):6.3f} sec | playouts after the move : {np.mean(n_playouts):6.1f}")
+
+def compare_playout_cap(selfplay_time=300, n_train_steps=200, batch_size=256, n_eval_games=10, n_playout=N_PLAYOUT, n_residual_block=2, n_kernel=32, seed=0):
+    '''
+    compare_playout_cap(selfplay_time : float, n_train_steps : int, batch_size : int, n_eval_games : int, n_playout : int, n_residual_block : int, n_kernel : int, seed : int)
+        > print : self-play positions & policy targets per hour without / with playout cap randomization,
+                  and the score of the model trained on the capped self-play against the one trained on the full self-play.
+
+    Both models start from the same weights, play selfplay_time sec of self-play, then are trained by n_train_steps steps on it.
+    So the score is the strength of the same self-play compute. (BattleNN, EVAL_TEMPERATURE)
+    '''
+    init_model = get_random_network(n_residual_block, n_kernel, seed)
+    models = {}
+
+    for playout_cap in (False, True):
+        random.seed(seed), np.random.seed(seed), torch.manual_seed(seed)
+        model = copy.deepcopy(init_model)
+
+        selfplay = get_selfplay(model, 1, n_playout, MCTS(n_playout), playout_cap)
+
+        start = time.perf_counter()
+        while time.perf_counter() - start < selfplay_time or len(selfplay.history) < batch_size:
+            selfplay._single_play()
+        elapsed = time.perf_counter() - start
+
+        trainer = TrainNetwork(model, batch_size, LEARNING_RATE, LEARN_DECAY, n_train_steps)
+        for _ in range(n_train_steps):
+            trainer._train(selfplay.history)
+        nn_cache.invalidate(model)
+        models[playout_cap] = model
+
+        n_positions = sum(selfplay.n_steps)
+        p_losses, v_losses, _ = zip(*trainer.losses[-(n_train_steps // 10):])
+        print(f"playout cap {str(playout_cap):<5} | games : {len(selfplay.n_steps):4d} | {n_positions / elapsed * 3600:8.0f} positions/h | "
+              f"{selfplay.n_full_searches / elapsed * 3600:8.0f} policy targets/h | p_loss : {np.mean(p_losses):.3f} | v_loss : {np.mean(v_losses):.3f}")
+
+    battle = BattleNN(models[True], models[False], n_eval_games, n_playout, EVAL_TEMPERATURE, (STATE_DIM, STATE_DIM))
+    first_score, second_score = battle._evaluate_network()
+    print(f"playout cap vs full search | score : {(first_score + second_score) / 2:4.2f} (first : {first_score:4.2f}, second : {second_score:4.2f})")
+
+def compare_solver(n_positions=20, min_moves=25, n_playout=N_PLAYOUT, n_residual_block=2, n_kernel=32, seed=0):
+    '''
+    compare_solver(n_positions : int, min_moves : int, n_playout : int, n_residual_block : int, n_kernel : int, seed : int)
+        > print : playouts & time per move of late positions with & without the MCTS-solver (self-play search, temp = 1),
+                  and the share of the visits spent on the root children the solver proved losing.
+
+    Positions are taken after min_moves random moves at least.
+    '''
+    model = get_random_network(n_residual_block, n_kernel, seed)
+    State = select_state(STATE_DIM)
+
+    positions = get_random_positions(State, n_positions, seed, min_moves=min_moves, max_share=1.0, unforced=True)
+
+    results = {}
+    for use_solver in (False, True):
+        mcts = MCTS(n_playout, use_nn_cache=False, use_solver=use_solver)
+        elapsed, n_playouts, root_children = 0, [], []
+
+        for state in positions:
+            random.seed(seed)
+            mcts.reset_tree() # the tree is kept only to read its root
+
+            start = time.perf_counter()
+            mcts.get_legal_policy(state, model, 1.0)
+            elapsed += time.perf_counter() - start
+
+            root_node = mcts.root_nodes[id(model)]
+            n_playouts.append(mcts.n_playouts_done)
+            root_children.append((root_node.child_stats[0].copy(), np.array(mcts.child_n), root_node.child_stats[3].copy(), root_node.proven))
+
+        results[use_solver] = root_children
+        print(f"solver {str(use_solver):<5} | {elapsed / len(positions) * 1e3:7.1f} ms/move | playouts : {np.mean(n_playouts):6.1f} / {n_playout}")
+
+    # playouts & policy on the children proven losing (for the root) by the solver, out of the positions not proven lost
+    proofs = [child_proven for _, _, child_proven, proven in results[True] if proven != -1]
+    for use_solver in (False, True):
+        root_children = [(child_n, policy_n) for (child_n, policy_n, _, _), (_, _, _, proven) in zip(results[use_solver], results[True]) if proven != -1]
+        wasted = [child_n[child_proven == 1].sum() / child_n.sum() for (child_n, _), child_proven in zip(root_children, proofs)]
+        n_lost = sum(child_proven[np.argmax(policy_n)] == 1 for (_, policy_n), child_proven in zip(root_children, proofs))
+        print(f"solver {str(use_solver):<5} | visits on proven-losing moves : {np.mean(wasted):5.1%} | policy argmax proven losing : {n_lost} / {len(proofs)}")
+
+    print(f"proven roots : win {sum(proven == 1 for _, _, _, proven in results[True])} / lose {len(positions) - len(proofs)} (of {len(positions)})")
+
+def compare_gumbel(model=None, n_playouts=(16, 32, 64), n_games=20, n_positions=30, n_opening=4, n_reference=N_PLAYOUT, policy_scale=5, n_residual_block=2, n_kernel=32, seed=0):
+    '''
+    compare_gumbel(model : nn.Module, n_playouts : tuple, n_games : int, n_positions : int, n_opening : int, n_reference : int, policy_scale : float, n_residual_block : int, n_kernel : int, seed : int)
+        > print : for each budget of n_playouts, the score of GumbelMCTS against MCTS (greedy, temp = 0) by the same playouts,
+                  and the move agreement of both with MCTS(n_reference) on random positions, with their time per move.
+
+    Games start from n_opening random moves and swap colors every game. (trees are not reused)
+    A trained model should be given : sigma(q) rescales q by its min & max, so the noise of an untrained value head decides the gumbel moves.
+    Without it, a random network is used, its policy head scaled by policy_scale.
+    '''
+    if model is None:
+        model = get_random_network(n_residual_block, n_kernel, seed, policy_scale)
+
+    State = select_state(STATE_DIM)
+    positions = get_random_positions(State, n_positions, seed, unforced=True)
+    rng = random.Random(seed)
+
+    random.seed(seed)
+    reference = MCTS(n_reference, reuse_tree=False, use_nn_cache=False)
+    best_actions = [argmax(reference.get_legal_policy(state, model, 0)) for state in positions]
+
+    for n_playout in n_playouts:
+        settings = {"puct" : MCTS(n_playout, reuse_tree=False, use_nn_cache=False),
+                    "gumbel" : GumbelMCTS(n_playout, use_nn_cache=False)}
+        elapsed, n_moves = {name : 0.0 for name in settings}, {name : 0 for name in settings}
+
+        # move agreement with the reference
+        n_agree = {}
+        for name, mcts in settings.items():
+            random.seed(seed), np.random.seed(seed)
+            n_agree[name] = sum(argmax(mcts.get_legal_policy(state, model, 0)) == best_action for state, best_action in zip(positions, best_actions))
+
+        # games : gumbel plays first in the even games
+        score = 0
+        for game in range(n_games):
+            random.seed(seed + game), np.random.seed(seed + game)
+            state = State()
+            for _ in range(n_opening):
+                state = state.next(rng.choice(list(state.get_legal_actions())))
+
+            players = ("gumbel", "puct") if game % 2 == 0 else ("puct", "gumbel")
+            while not state.is_done():
+                name = players[0] if state.is_first_player() else players[1]
+
+                start = time.perf_counter()
+                legal_policy = settings[name].get_legal_policy(state, model, 0)
+                elapsed[name] += time.perf_counter() - start
+                n_moves[name] += 1
+
+                state = state.next(int(state.get_legal_actions()[argmax(legal_policy)]))
+
+            # the player of the ended state lost (or drew)
+            loser = players[0] if state.is_first_player() else players[1]
+            score += 0.5 if not state.is_lose() else float(loser == "puct")
+
+        for name, mcts in settings.items():
+            line = f"{name:<6} {n_playout:3d} playouts | {elapsed[name] / max(n_moves[name], 1) * 1e3:6.1f} ms/move | agreement with {n_reference} playouts : {n_agree[name] / len(positions):4.2f}"
+            if name == "gumbel":
+                line += f" | score vs puct : {score / n_games:4.2f}"
+            print(line)
+
+if __name__=="__main__":
+    compare_state_engines()
+    compare_win_detection()
+    compare_batched_board()
+    compare_encoding()
+    check_zobrist_collisions()
+    compare_mcts()
+    compare_board_sizes()
+    compare_threat_search()
+    compare_leaf_batch()
+    compare_tree_storage()
+    compare_puct_selection()
+    compare_tree_reuse()
+    compare_transposition()
+    compare_nn_cache()
+    compare_playout_loop()
+    compare_time_limit()
+    compare_early_stop()
+    compare_search_threads()
+    compare_root_parallel()
+    compare_pondering()
+    compare_playout_cap()
+    compare_solver()
+    compare_gumbel()
@@ -40,7 +40,7 @@ def flip_diagonal_anti(board):
     '''
     반대 대각선 반사 
     '''
-    return np.flip(np.transpose(board, axes=(0, 2, 1)), axis=2) 
+    return np.flip(np.transpose(board, axes=(0, 2, 1)), axis=(1, 2)) 
 
 # inverse methods 
 
@@ -82,9 +82,9 @@ def inverse_flip_diagonal_main(board):
 
 def inverse_flip_diagonal_anti(board):
     ''' 
-    반대 대각선(/) 반사의 역변환 → 다시 동일한 변환 후 좌우 반사 적용 
+    반대 대각선(/) 반사의 역변환 → 다시 동일한 변환 적용 
     '''
-    return np.flip(np.transpose(board, axes=(0, 2, 1)), axis=2)
+    return np.flip(np.transpose(board, axes=(0, 2, 1)), axis=(1, 2))
 
 def get_original(board):
     return board
@@ -134,3 +134,14 @@ rotate_ftns = [rotate_90, rotate_180, rotate_270,
                flip_vertical, flip_horizontal, 
                flip_diagonal_main, flip_diagonal_anti]
 
+
+def get_symmetry_idxs(state_shape):
+    '''
+    get_symmetry_idxs(state_shape : tuple) -> idxs : tuple[int]
+
+    idx of get_dihedral_transpose_ftns which keep the board shape.
+    Square boards have all 8, the others only original, rotate_180, flip_vertical, flip_horizontal.
+    '''
+    if state_shape[0] == state_shape[1]:
+        return tuple(range(8))
+    return (0, 2, 4, 5)
@@ -6,6 +6,7 @@ import numpy as np
 import copy
 
 from Omok.state import *
+from Omok.lines import *
 from config import *
 
 def is_first_player(state):
@@ -13,60 +14,30 @@ def is_first_player(state):
         n_enemy_actions = np.sum(state[1])
         return (n_my_actions + n_enemy_actions) % 2 == 0  
 
-def divide(x):
-    row, col = divmod(x, STATE_SHAPE[1])
+def divide(x, ncol=STATE_SHAPE[1]):
+    row, col = divmod(x, ncol)
     row , col = row + 0.5, col + 0.5
     return (row, col)
 
-def check_consecutive(input):
-    def _make_diag_mask():
-        mask = np.zeros(shape=STATE_SHAPE, dtype=bool)
-        mask[:, -(WINNING_CONDITION-1):] = 1
-        return mask
-    
+def check_consecutive(input, state_shape=STATE_SHAPE, winning_condition=WINNING_CONDITION):
+    '''
+    check_consecutive(input : np.ndarray | list, state_shape : tuple, winning_condition : int) -> (is_consecutive : bool, indices : list)
+
+    input is a board of single player or list of its actions.
+    '''
     if type(input) == np.ndarray:
-        indices = np.arange(N_ACTIONS)[input.astype(bool).reshape(-1)] 
-    
+        board = input.reshape(input.shape if input.ndim == 2 else state_shape)
+
     elif type(input) == list:
-        indices = input
-    
-    # mask & unavailble idx list 
-    diag_mask = _make_diag_mask()
-    anti_diag_mask = diag_mask[:,::-1]
-
-    diag_idx_list = list(np.arange(N_ACTIONS).reshape(STATE_SHAPE)[diag_mask])
-    anti_diag_idx_list = list(np.arange(N_ACTIONS).reshape(STATE_SHAPE)[anti_diag_mask])           
-
-    for index in indices:
-        # find diag & row-consecutive list  
-        if index not in diag_idx_list:
-                diag_lst = list(range(index, index+(WINNING_CONDITION-1)*(STATE_SHAPE[1]+1)+1, STATE_SHAPE[1]+1))
-                row_lst = list(range(index, index+WINNING_CONDITION))
-
-                is_row = all(element in indices for element in row_lst)
-                is_diag = all(element in indices for element in diag_lst)
-
-                if is_diag:
-                    return True, diag_lst
-                elif is_row:
-                    return True, row_lst
-                
-        # find anti-diag-consecutive list  
-        if index not in anti_diag_idx_list:
-                anti_diag_lst = list(range(index, index+(WINNING_CONDITION-1)*(STATE_SHAPE[1]-1)+1, STATE_SHAPE[1]-1))
-                is_anti_diag = all(element in indices for element in anti_diag_lst)
-
-                if is_anti_diag:
-                    return True, anti_diag_lst
-                           
-        # find col-consecutive list  
-        col_lst = list(range(index, index+(WINNING_CONDITION-1)*STATE_SHAPE[1]+1, STATE_SHAPE[1]))
-        is_col = all(element in indices for element in col_lst)
-
-        if is_col:
-            return True, col_lst
-                
-    return False, []
+        board = np.zeros(state_shape[0] * state_shape[1], dtype=bool)
+        board[input] = True
+        board = board.reshape(state_shape)
+
+    line = find_winning_line(board, winning_condition)
+
+    if line is None:
+        return False, []
+    return True, line.tolist()
 
 def draw_omok_board(state, next_action=None, ax=None):
     '''
@@ -117,7 +88,7 @@ def draw_omok_board(state, next_action=None, ax=None):
         val, indices_lst = check_consecutive(state[1])
 
     if val:
-        result = list(map(divide, indices_lst))
+        result = [divide(idx, ncol) for idx in indices_lst]
 
         rows, cols = zip(*result)  
         rows, cols = list(rows) , list(cols) 
@@ -143,7 +114,7 @@ def visualize_MCTS_visits(visits, state, next_action=None, ax=None, agent_type='
     color_dict = {'best' : 'PuRd',
                   'recent' : 'GnBu'}
     
-    visits = np.array(visits).reshape(STATE_SHAPE)
+    visits = np.array(visits).reshape(np.shape(state)[1:])
 
     board = state[0] + state[1] * -1 if is_first_player(state) else state[0] * -1 + state[1]
     nrow, ncol = board.shape
@@ -194,7 +165,7 @@ def visualize_current_policy(policy, state, next_action=None, ax=None, agent_typ
     color_dict = {'best' : 'OrRd',
                   'recent' : 'BuPu'}
     
-    policy = np.array(policy).reshape(STATE_SHAPE).round(2)
+    policy = np.array(policy).reshape(np.shape(state)[1:]).round(2)
 
     board = state[0] + state[1] * -1 if is_first_player(state) else state[0] * -1 + state[1]
     nrow, ncol = board.shape
@@ -295,11 +266,11 @@ def visualize_game_result(result:dict, path=None, download=None):
     # 그래프 표시
     plt.show()
 
-def visualize_game_record(game_action_list, ax=None, download=None, path=None):
+def visualize_game_record(game_action_list, ax=None, download=None, path=None, state_shape=STATE_SHAPE):
     '''
     game record by action list
     '''
-    nrow, ncol = STATE_SHAPE
+    nrow, ncol = state_shape
 
     if game_action_list is None:  # game_action_list가 None이면 오류 방지
         print("⚠ Warning: No game action list available for visualization.")
@@ -338,13 +309,13 @@ def visualize_game_record(game_action_list, ax=None, download=None, path=None):
     black_indices = game_action_list[::2]
     white_indices = game_action_list[1::2]
 
-    val, indices_lst = check_consecutive(black_indices)
+    val, indices_lst = check_consecutive(black_indices, state_shape)
 
     if val is not True:
-        val, indices_lst = check_consecutive(white_indices)
+        val, indices_lst = check_consecutive(white_indices, state_shape)
 
     if val:
-        result = list(map(divide, indices_lst))
+        result = [divide(idx, ncol) for idx in indices_lst]
 
         rows, cols = zip(*result)  
         rows, cols = list(rows) , list(cols) 
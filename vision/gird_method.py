@@ -2,18 +2,20 @@ import cv2
 import numpy as np
 
 def analyze_omok_board(image_path, cell_size=30, grid_size=19,
-                       show_grid=True, improve_detection=True):
+                       show_grid=True, improve_detection=True, board_size=9):
     """
     analyze_omok_board(image_path : str,
                        cell_size : int,
                        grid_size : int,
                        show_grid : bool,
-                       improve_detection : bool)
+                       improve_detection : bool,
+                       board_size : int)
     -> return (state : numpy.ndarray, black_stones : list, white_stones : list)
     ---------------------------------------------------------------------------
     바둑판 이미지를 분석하여 상태 배열, 검은돌 좌표, 흰돌 좌표를 반환합니다.
     show_grid=True일 경우, 격자점과 검출된 돌을 이미지에 표시하여 띄웁니다.
     improve_detection=True일 경우, 모폴로지 연산 등 추가 전처리를 적용합니다.
+    board_size는 반환할 (좌상단) 바둑판 크기입니다. (state의 STATE_SHAPE와 같게)
     """
 
     # 1) 이미지 로드
@@ -124,8 +126,8 @@ def analyze_omok_board(image_path, cell_size=30, grid_size=19,
         cv2.waitKey(0)  # 아무 키나 누를 때까지 대기
         cv2.destroyAllWindows()
 
-    start = 0  # 5
-    end = 9  # 14
+    start = 0
+    end = start + board_size
 
     center_state = state[start:end, start:end]
 
@@ -4,16 +4,18 @@ from sklearn.cluster import KMeans
 
 def analyze_omok_board_19x19(
     image_path="omok.jpg",
-    show_result=True
+    show_result=True,
+    board_size=9
 ):
     """
-    analyze_omok_board_19x19(image_path : str, show_result : bool) 
+    analyze_omok_board_19x19(image_path : str, show_result : bool, board_size : int) 
     -> return (state : numpy.ndarray, black_stones : list, white_stones : list)
     ---------------------------------------------------------------------------
     1) 허프 변환(HoughLinesP)으로 19개의 가로/세로 줄을 찾아 바둑판 교차점 검출
     2) KMeans(n_clusters=361)로 교차점을 361개로 묶어 (19x19) 격자 형태로 정렬
     3) 각 교차점 주변(예: 20×20 영역)의 밝기로 돌(흑, 백) 또는 빈칸을 판정
     4) 흑돌과 백돌 좌표, 전체 상태 배열을 반환
+       (중앙의 board_size x board_size 영역만 반환, state의 STATE_SHAPE와 같게)
     """
     # 1) 이미지 로드
     img = cv2.imread(image_path)
@@ -168,8 +170,8 @@ def analyze_omok_board_19x19(
         cv2.destroyAllWindows()
 
 
-    start = (19 - 9) // 2  # 5
-    end = start + 9  # 14
+    start = (19 - board_size) // 2  # 9 -> 5
+    end = start + board_size  # 9 -> 14
 
     center_state = state[start:end, start:end]
 
@@ -1,5 +1,6 @@
 import sys
 import os
+import threading
 
 # 현재 파일(server.py)이 있는 경로 기준으로 상위 디렉토리(AiGO)를 sys.path에 추가
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -9,6 +10,8 @@ import numpy as np
 
 from Omok.state import *
 from Omok.MCTS import *
+from Omok.parallelMCTS import *
+from Omok.lines import *
 from models.load_model import *
 
 # web utils 
@@ -17,7 +20,7 @@ app = Flask(__name__)
 # State / board 
 State = select_state(STATE_DIM)
 state = State()
-board = np.zeros((2, 9, 9), dtype=int)
+board = np.zeros((2, *state.state_shape), dtype=int)
 
 # game status 
 game_result = 2 # (win, draw, continue)
@@ -25,9 +28,14 @@ is_player_turn = None
 is_second_player = None
 
 # alpha zero setting
-mcts = MCTS(N_PLAYOUT)
+mcts = ParallelMCTS(N_PLAYOUT, N_SEARCH_THREADS, reuse_tree=USE_PONDERING, count_reused=USE_PONDERING, time_limit=MOVE_TIME_LIMIT) # response time is bounded by MOVE_TIME_LIMIT
 get_next_action = mcts.get_legal_actions_of(model, 0, with_policy=False)
 
+# pondering : search on the human's time (see MCTS.ponder())
+pondering = USE_PONDERING
+ponder_stop = threading.Event()
+ponder_thread = None
+
 @app.route('/')
 def home():
     """ 기본 페이지 제공 """
@@ -41,7 +49,8 @@ def get_board():
     """ 현재 바둑판 상태 반환 """
     return jsonify({"board": board.tolist(),
                     "game_result" : game_result,
-                    "is_player_turn" : int(not(is_player_turn))
+                    "is_player_turn" : int(not(is_player_turn)),
+                    "winning_line" : get_winning_line()
                     })
 
 
@@ -56,6 +65,7 @@ def update_board():
     if board[0, x, y] == 1 or board[1, x, y] == 1:
         return jsonify({"message": "이미 돌이 있는 자리입니다."}), 400
     
+    stop_pondering()
     value = place_stone_by_human(x, y, is_second_player)  
   
     if not state.is_done():
@@ -74,7 +84,7 @@ def place_stone_by_human(x, y, player):
     
     board[player, x, y] = 1  # 해당 위치에 돌 놓기
 
-    action_idx = x*9 + y
+    action_idx = x*board.shape[2] + y
     state = state.next(action_idx)
     print(state)
 
@@ -92,7 +102,8 @@ def place_stone_by_AI(is_second_player):
 
     ai_board_idx = int(not is_second_player)
     action = get_next_action(state)  # AI의 다음 수 결정
-    x, y = divmod(action, 9)
+    print(f"AI searched {mcts.n_playouts_done} playouts ({mcts.n_reused} reused)")
+    x, y = divmod(action, board.shape[2])
 
     board[ai_board_idx, x, y] = 1  # AI가 돌을 놓음
     state = state.next(action)  
@@ -100,6 +111,7 @@ def place_stone_by_AI(is_second_player):
 
     game_result = get_game_result(state)
     is_player_turn = 1 # 순서 업데이트 
+    start_pondering()
 
     return jsonify({
         "message": "AI가 돌을 놓았습니다.", 
@@ -108,6 +120,30 @@ def place_stone_by_AI(is_second_player):
         "is_AI": 1 })
 
 
+def start_pondering():
+    """ 사람이 생각하는 동안 현재 state의 tree를 계속 탐색 """
+    global ponder_stop, ponder_thread
+
+    if not pondering or state.is_done():
+        return
+
+    ponder_stop = threading.Event()
+    ponder_thread = threading.Thread(target=mcts.ponder, args=(state, model, ponder_stop), daemon=True)
+    ponder_thread.start()
+
+
+def stop_pondering():
+    """ pondering을 멈추고 thread가 끝날 때까지 대기 """
+    global ponder_thread
+
+    if ponder_thread is None:
+        return
+
+    ponder_stop.set()
+    ponder_thread.join()
+    ponder_thread = None
+
+
 def get_game_result(state):
     if not state.is_done():
         return 2 # continue
@@ -118,12 +154,22 @@ def get_game_result(state):
     else:
         return 1 # draw
 
+def get_winning_line():
+    """ 완성된 오목 줄의 좌표 반환 (없으면 빈 리스트) """
+    for player_board in board:
+        line = find_winning_line(player_board, state.winning_condition)
+        if line is not None:
+            return [list(divmod(int(cell), board.shape[2])) for cell in line]
+    return []
+
 @app.route('/reset-board', methods=['POST'])
 def reset_board():
     """ 바둑판 초기화 """
     global board, state
-    board = np.zeros((2, 9, 9), dtype=int)  # 모든 값 0으로 초기화
+    stop_pondering()
     state = State() # state 초기화 
+    mcts.reset_tree()
+    board = np.zeros((2, *state.state_shape), dtype=int)  # 모든 값 0으로 초기화
     return jsonify({"message": "바둑판이 초기화되었습니다.", "board": board.tolist()})
 
 @app.route('/trigger', methods=['POST'])
@@ -145,6 +191,7 @@ def trigger_action():
             return jsonify({"error": "isPlayerTurn 값이 전달되지 않았습니다."}), 400
 
         if not is_player_turn:
+            stop_pondering()
             return place_stone_by_AI(is_second_player)  # AI가 수를 둠
 
         return jsonify({"message": "플레이어의 차례입니다."})
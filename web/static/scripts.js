@@ -12,9 +12,10 @@ canvas.style.height = `${displaySize}px`;
 ctx.scale(2, 2);
 ctx.imageSmoothingEnabled = true;
 
-const gridSize = 9;
-const cellSize = displaySize / gridSize;
-const stoneRadius = cellSize * 0.4;
+// 바둑판 크기는 서버의 board 크기를 따름 (setGridSize)
+let gridSize = 9;
+let cellSize = displaySize / gridSize;
+let stoneRadius = cellSize * 0.4;
 let isWhite = 1;
 let startFlag = 0;
 let isDone = 0;
@@ -80,6 +81,7 @@ async function fetchBoard() {
         const response = await axios.get('/get-board');
         console.log("서버 응답 데이터:", response.data);
         renderBoard(response.data.board);
+        drawWinningLine(response.data.winning_line);
         updateResultBoard(response.data);
         
         // 🛠 보드 업데이트 후 isDone 초기화
@@ -139,7 +141,14 @@ function drawBoard() {
     }
 }
 
+function setGridSize(size) {
+    gridSize = size;
+    cellSize = displaySize / gridSize;
+    stoneRadius = cellSize * 0.4;
+}
+
 function renderBoard(board) {
+    setGridSize(board[0].length);
     drawBoard();
     for (let x = 0; x < gridSize; x++) {
         for (let y = 0; y < gridSize; y++) {
@@ -158,6 +167,23 @@ function drawStone(x, y, color) {
     ctx.stroke();
 }
 
+function drawWinningLine(line) {
+    if (!line || line.length === 0) {
+        return;
+    }
+    ctx.save();
+    ctx.lineWidth = 4;
+    ctx.strokeStyle = "#70d96b";
+    ctx.beginPath();
+    line.forEach(([x, y], idx) => {
+        const posX = (x + 0.5) * cellSize;
+        const posY = (y + 0.5) * cellSize;
+        idx === 0 ? ctx.moveTo(posX, posY) : ctx.lineTo(posX, posY);
+    });
+    ctx.stroke();
+    ctx.restore();
+}
+
 canvas.addEventListener("click", (event) => {
     const rect = canvas.getBoundingClientRect();
     placeStone(